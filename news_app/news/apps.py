@@ -4,3 +4,15 @@ from django.apps import AppConfig
 class NewsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'news'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+        from django.db.models.signals import post_delete, pre_delete
+        from . import facets, metrics
+        from .utils import dedup
+
+        # Bulk writes keep the facets in step themselves; deletions go through these
+        post_delete.connect(facets.article_deleted, sender='news.NewsArticle', dispatch_uid='news_article_facets')
+        post_delete.connect(facets.source_deleted, sender='news.NewsSource', dispatch_uid='news_source_facets')
+        pre_delete.connect(dedup.promote_duplicate, sender='news.NewsArticle', dispatch_uid='news_article_story')
+        connection_created.connect(metrics.install_query_counter, dispatch_uid='news_view_queries')
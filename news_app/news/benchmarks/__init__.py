@@ -0,0 +1 @@
+"""Offline ingestion benchmarks served from a recorded corpus on a local HTTP server."""
@@ -0,0 +1,116 @@
+import mimetypes
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import List
+
+FIXTURES_DIR = Path(__file__).resolve().parent / 'fixtures'
+# Fixture files refer to the server with this placeholder so the corpus works on any port
+BASE_URL_PLACEHOLDER = b'{{base_url}}'
+
+CONTENT_TYPES = {
+    '.xml': 'application/rss+xml; charset=utf-8',
+    '.html': 'text/html; charset=utf-8',
+}
+
+
+class FixtureServer:
+    """
+    Serves the recorded feed and article corpus on localhost.
+
+    Every response waits latency seconds first, and error_rate of the requests
+    fail with a 503 so the client's retries and error paths are exercised. The
+    random choices are seeded, so two runs with the same settings see the same
+    failures.
+    """
+
+    def __init__(self, fixtures_dir=FIXTURES_DIR, latency=0.0, error_rate=0.0, seed=0, host='127.0.0.1', port=0):
+        self.fixtures_dir = Path(fixtures_dir)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.requests = 0
+        self.errors = 0
+        self.bytes_sent = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._server.serve_forever, name='fixture-server', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def feed_urls(self) -> List[str]:
+        return [f'{self.base_url}/feeds/{path.name}' for path in sorted(self.fixtures_dir.glob('feeds/*.xml'))]
+
+    def article_urls(self) -> List[str]:
+        return [f'{self.base_url}/articles/{path.name}' for path in sorted(self.fixtures_dir.glob('articles/*.html'))]
+
+    def _should_fail(self) -> bool:
+        with self._lock:
+            self.requests += 1
+            failed = self._random.random() < self.error_rate
+            if failed:
+                self.errors += 1
+            return failed
+
+    def _load(self, request_path: str):
+        path = (self.fixtures_dir / request_path.split('?', 1)[0].lstrip('/')).resolve()
+        if self.fixtures_dir.resolve() not in path.parents or not path.is_file():
+            return None
+        return path.read_bytes().replace(BASE_URL_PLACEHOLDER, self.base_url.encode())
+
+    def _handler_class(self):
+        fixture_server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                if fixture_server.latency:
+                    time.sleep(fixture_server.latency)
+                if fixture_server._should_fail():
+                    return self._respond(503, b'Injected failure', 'text/plain')
+
+                body = fixture_server._load(self.path)
+                if body is None:
+                    return self._respond(404, b'Not found', 'text/plain')
+                suffix = Path(self.path).suffix
+                content_type = CONTENT_TYPES.get(suffix) or mimetypes.guess_type(self.path)[0] or 'application/octet-stream'
+                self._respond(200, body, content_type)
+
+            def _respond(self, status, body, content_type):
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                with fixture_server._lock:
+                    fixture_server.bytes_sent += len(body)
+
+            def log_message(self, format, *args):
+                # Keep benchmark output readable
+                pass
+
+        return Handler
@@ -0,0 +1,221 @@
+import asyncio
+import os
+import platform
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+import django
+from django.db import connection
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from .. import metrics
+from ..models import NewsSource, RSSLink
+from ..utils.article_fetcher import afetch_article_content, fetch_article_content, get_html_parser
+from ..utils.feed_parser import FeedParser
+from .fixture_server import FixtureServer
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+BENCHMARK_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Ingestion stages in pipeline order; html_extract includes handing the page to an extraction worker
+STAGES = ('feed_fetch', 'xml_parse', 'article_fetch', 'html_extract', 'db_write')
+
+
+def stage_totals() -> Dict[str, Dict]:
+    """Runs and seconds recorded so far per ingestion stage (see news.metrics)."""
+    totals = defaultdict(lambda: {'calls': 0, 'seconds': 0.0})
+    for sample, labels, value in metrics.STAGE_DURATION.samples():
+        stage = dict(labels)['stage']
+        if sample.endswith('_count'):
+            totals[stage]['calls'] = value
+        elif sample.endswith('_sum'):
+            totals[stage]['seconds'] = value
+    return dict(totals)
+
+
+def stage_report(before: Dict[str, Dict], after: Dict[str, Dict]) -> Dict[str, Dict]:
+    """
+    What each stage added between two stage_totals().
+
+    Stages run on many threads at once, so their seconds are thread-seconds and
+    can exceed the wall-clock time of the pass.
+    """
+    empty = {'calls': 0, 'seconds': 0.0}
+    return {
+        stage: {
+            'calls': after[stage]['calls'] - before.get(stage, empty)['calls'],
+            'seconds': round(after[stage]['seconds'] - before.get(stage, empty)['seconds'], 4),
+        }
+        for stage in STAGES if stage in after
+    }
+
+
+class QueryCounter:
+    """Counts the queries run on this thread's database connection."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+    @contextmanager
+    def counting(self):
+        self.count = 0
+        with connection.execute_wrapper(self):
+            yield self
+
+
+@contextmanager
+def benchmark_database():
+    """
+    Run against a throwaway test database and a local-memory cache, so real
+    articles and the cache shared with running processes are never touched.
+    """
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        with override_settings(CACHES=BENCHMARK_CACHES):
+            yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+def peak_rss_kb() -> Optional[Dict[str, int]]:
+    """Peak resident set size of this process and of its finished children."""
+    if resource is None:
+        return None
+    # ru_maxrss is in kilobytes on Linux but bytes on macOS
+    scale = 1024 if platform.system() == 'Darwin' else 1
+    return {
+        'self': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // scale,
+        'children': resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss // scale,
+    }
+
+
+def register_feeds(feed_urls: List[str]) -> List[RSSLink]:
+    """Create one news source per fixture feed."""
+    links = []
+    for url in feed_urls:
+        name = url.rsplit('/', 1)[-1].rsplit('.', 1)[0].title()
+        source, _ = NewsSource.objects.get_or_create(name=name)
+        links.append(RSSLink.objects.create(source=source, url=url))
+    return links
+
+
+def run_ingestion_pass(name, parser, extractor, queries) -> Dict:
+    """Refresh every registered feed once and measure it."""
+    before = stage_totals()
+    with queries.counting():
+        stats = parser.fetch_feeds(RSSLink.objects.all(), extractor=extractor)
+    return {
+        'name': name,
+        'feeds': stats.feeds,
+        'feeds_failed': stats.feeds_failed,
+        'articles': stats.articles,
+        'inserted': stats.inserted,
+        'updated': stats.updated,
+        'articles_skipped': stats.articles_skipped,
+        'elapsed': round(stats.elapsed, 4),
+        'feeds_per_sec': round(stats.feeds_per_sec, 2),
+        'articles_per_sec': round(stats.articles_per_sec, 2),
+        'stages': stage_report(before, stage_totals()),
+        'queries': queries.count,
+        'queries_per_article': round(queries.count / stats.articles, 2) if stats.articles else None,
+    }
+
+
+def run_detail_pass(urls: List[str]) -> Dict:
+    """Fetch single articles the way the article detail view does on a cache miss."""
+    failed = 0
+    started = time.perf_counter()
+    for url in urls:
+        if not isinstance(fetch_article_content(url), dict):
+            failed += 1
+    elapsed = max(time.perf_counter() - started, 1e-9)
+    return {
+        'articles': len(urls),
+        'failed': failed,
+        'elapsed': round(elapsed, 4),
+        'articles_per_sec': round(len(urls) / elapsed, 2),
+        'mean_latency_ms': round(elapsed / len(urls) * 1000, 2) if urls else None,
+    }
+
+
+def run_concurrent_detail_pass(urls: List[str]) -> Dict:
+    """Fetch the same articles all at once, the way concurrent readers reach the async detail view."""
+    async def fetch_all():
+        return await asyncio.gather(*(afetch_article_content(url) for url in urls))
+
+    started = time.perf_counter()
+    results = asyncio.run(fetch_all())
+    elapsed = max(time.perf_counter() - started, 1e-9)
+    return {
+        'articles': len(urls),
+        'failed': sum(1 for article in results if article is None),
+        'elapsed': round(elapsed, 4),
+        'articles_per_sec': round(len(urls) / elapsed, 2),
+    }
+
+
+def run_benchmark(latency=0.0, error_rate=0.0, seed=0, passes=2, workers=None, per_host=None,
+                  extract_workers=None, detail_articles=20) -> Dict:
+    """
+    Serve the fixture corpus locally and ingest it end to end.
+
+    The first pass starts from an empty database; later passes see every article
+    already stored, which is what a routine refresh looks like. Afterwards a sample
+    of articles is fetched one at a time through fetch_article_content, then
+    all at once through afetch_article_content.
+    """
+    parser = FeedParser(max_workers=workers, per_host_limit=per_host, extract_workers=extract_workers)
+    queries = QueryCounter()
+    started_at = timezone.now()
+
+    with benchmark_database(), FixtureServer(latency=latency, error_rate=error_rate, seed=seed) as server:
+        register_feeds(server.feed_urls())
+        with parser.build_extractor() as extractor:
+            # Start the worker processes before the clock does
+            extractor.extract(b'<html><body><p>warm up</p></body></html>', server.base_url)
+            results = [
+                run_ingestion_pass('cold' if index == 0 else f'warm{index}', parser, extractor, queries)
+                for index in range(passes)
+            ]
+        detail = run_detail_pass(server.article_urls()[:detail_articles])
+        concurrent_detail = run_concurrent_detail_pass(server.article_urls()[:detail_articles])
+        server_stats = {'requests': server.requests, 'errors': server.errors, 'bytes_sent': server.bytes_sent}
+
+    return {
+        'started_at': started_at.isoformat(),
+        'environment': {
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'html_parser': get_html_parser(),
+        },
+        'config': {
+            'latency': latency,
+            'error_rate': error_rate,
+            'seed': seed,
+            'workers': parser.max_workers,
+            'per_host': parser.per_host_limit,
+            'extract_workers': parser.extract_workers,
+        },
+        'passes': results,
+        'detail': detail,
+        'concurrent_detail': concurrent_detail,
+        'server': server_stats,
+        'peak_rss_kb': peak_rss_kb(),
+    }
@@ -0,0 +1,111 @@
+# news/cache.py
+import hashlib
+from django.conf import settings
+from django.core.cache import cache
+from .models import ArticleFacet, NewsSource, CustomFeed
+
+SOURCES_KEY = 'news:sources'
+CATEGORIES_KEY = 'news:categories'
+CUSTOM_FEEDS_KEY = 'news:custom_feeds'
+ARTICLE_LIST_VERSION_KEY = 'news:article_list:version'
+
+# The getters serve the async views, so they use the async ORM and cache methods
+
+
+def _ttl():
+    return getattr(settings, 'NEWS_CACHE_TTL', 300)
+
+
+def _sources():
+    return NewsSource.objects.prefetch_related('links').order_by('id')
+
+
+def _source_data(source):
+    return {
+        'id': source.id,
+        'name': source.name,
+        'links': [link.url for link in source.links.all()]
+    }
+
+
+async def aget_sources():
+    """Sources with their feed links, as served by the sources endpoint."""
+    data = await cache.aget(SOURCES_KEY)
+    if data is None:
+        data = [_source_data(source) async for source in _sources()]
+        await cache.aset(SOURCES_KEY, data, _ttl())
+    return data
+
+
+def _categories():
+    return ArticleFacet.objects.filter(kind=ArticleFacet.CATEGORY, article_count__gt=0)\
+                               .exclude(value='')\
+                               .order_by('value')\
+                               .values_list('value', flat=True)
+
+
+async def aget_categories():
+    """Non-empty article categories, read from the facet table."""
+    data = await cache.aget(CATEGORIES_KEY)
+    if data is None:
+        data = [category async for category in _categories()]
+        await cache.aset(CATEGORIES_KEY, data, _ttl())
+    return data
+
+
+def _custom_feeds():
+    return CustomFeed.objects.prefetch_related('sources').order_by('id')
+
+
+def _custom_feed_data(feed):
+    return {
+        'id': feed.id,
+        'name': feed.name,
+        'sources': [{'id': source.id, 'name': source.name} for source in feed.sources.all()]
+    }
+
+
+async def aget_custom_feeds():
+    """Custom feeds with the sources they combine."""
+    data = await cache.aget(CUSTOM_FEEDS_KEY)
+    if data is None:
+        data = [_custom_feed_data(feed) async for feed in _custom_feeds()]
+        await cache.aset(CUSTOM_FEEDS_KEY, data, _ttl())
+    return data
+
+
+def _article_list_key(version, path, params):
+    raw = path + '?' + '&'.join(f'{key}={value}' for key, value in sorted(params.items()))
+    return f'news:article_list:{version}:' + hashlib.md5(raw.encode('utf-8')).hexdigest()
+
+
+async def aarticle_list_key(path, params):
+    """Cache key for a rendered article list page, tied to the current list version."""
+    return _article_list_key(await cache.aget_or_set(ARTICLE_LIST_VERSION_KEY, 1, None), path, params)
+
+
+async def aget_article_list(key):
+    return await cache.aget(key)
+
+
+async def aset_article_list(key, data):
+    await cache.aset(key, data, _ttl())
+
+
+def invalidate_sources():
+    # Custom feeds embed source names, so they go stale with the sources
+    cache.delete_many([SOURCES_KEY, CUSTOM_FEEDS_KEY])
+
+
+def invalidate_custom_feeds():
+    cache.delete(CUSTOM_FEEDS_KEY)
+
+
+def invalidate_articles():
+    """Drop everything derived from the article table after ingestion."""
+    cache.delete(CATEGORIES_KEY)
+    try:
+        cache.incr(ARTICLE_LIST_VERSION_KEY)
+    except ValueError:
+        # No version stored yet, so there are no cached pages to invalidate
+        pass
@@ -0,0 +1,87 @@
+# news/compression.py
+import zlib
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+from django.conf import settings
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# First byte of every stored value, naming how the rest of it is encoded
+RAW = 0
+ZLIB = 1
+ZSTD = 2
+CODEC_NAMES = {RAW: 'raw', ZLIB: 'zlib', ZSTD: 'zstd'}
+
+ZLIB_LEVEL = 6
+ZSTD_LEVEL = 3
+# Shorter texts are kept raw; the codec's framing would eat most of the saving
+MIN_COMPRESS_LENGTH = 128
+
+
+def default_codec() -> int:
+    """NEWS_CONTENT_CODEC when set, otherwise zstd when it is installed and zlib if not."""
+    configured = getattr(settings, 'NEWS_CONTENT_CODEC', None)
+    if configured == 'zstd' and zstandard is None:
+        raise RuntimeError('NEWS_CONTENT_CODEC is zstd but the zstandard package is not installed')
+    if configured:
+        return {name: codec for codec, name in CODEC_NAMES.items()}[configured]
+    return ZSTD if zstandard is not None else ZLIB
+
+
+def compress(text: str, codec: Optional[int] = None) -> bytes:
+    """Encode text behind a one-byte codec header, raw when compression would not pay off."""
+    raw = text.encode('utf-8')
+    codec = default_codec() if codec is None else codec
+    if len(raw) >= MIN_COMPRESS_LENGTH and codec != RAW:
+        if codec == ZSTD:
+            packed = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(raw)
+        else:
+            packed = zlib.compress(raw, ZLIB_LEVEL)
+        if len(packed) < len(raw):
+            return bytes((codec,)) + packed
+    return bytes((RAW,)) + raw
+
+
+def decompress(data: bytes) -> str:
+    """Decode a value written by compress()."""
+    data = bytes(data)
+    if not data:
+        return ''
+    codec, payload = data[0], data[1:]
+    if codec == ZLIB:
+        return zlib.decompress(payload).decode('utf-8')
+    if codec == ZSTD:
+        if zstandard is None:
+            raise RuntimeError('Content was compressed with zstd but the zstandard package is not installed')
+        # Frames from ZstdCompressor.compress() record their size, which decompress() requires
+        return zstandard.ZstdDecompressor().decompress(payload).decode('utf-8')
+    if codec == RAW:
+        return payload.decode('utf-8')
+    raise ValueError(f'Unknown compression header {codec}')
+
+
+@dataclass
+class CompressionStats:
+    """Stored against original sizes of a set of compressed values, per codec."""
+    rows: Dict[str, int] = field(default_factory=dict)
+    stored_bytes: Dict[str, int] = field(default_factory=dict)
+    original_bytes: Dict[str, int] = field(default_factory=dict)
+
+    def add(self, data: Optional[bytes]) -> None:
+        if data is None:
+            return
+        data = bytes(data)
+        original = len(decompress(data).encode('utf-8'))
+        name, stored = CODEC_NAMES[data[0]] if data else 'raw', len(data)
+        self.rows[name] = self.rows.get(name, 0) + 1
+        self.stored_bytes[name] = self.stored_bytes.get(name, 0) + stored
+        self.original_bytes[name] = self.original_bytes.get(name, 0) + original
+
+    @property
+    def ratio(self) -> Optional[float]:
+        """Original size divided by stored size over every value."""
+        stored = sum(self.stored_bytes.values())
+        return sum(self.original_bytes.values()) / stored if stored else None
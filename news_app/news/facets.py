@@ -0,0 +1,141 @@
+# news/facets.py
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+from django.db import transaction
+from django.db.models import Count, DateTimeField, F, Max, Value
+from django.db.models.functions import Coalesce, Greatest
+from . import cache as news_cache
+from .models import ArticleFacet, NewsArticle
+
+FacetKey = Tuple[str, str]
+
+TOTAL_KEY: FacetKey = (ArticleFacet.TOTAL, '')
+
+
+def facet_keys(category: str, news_source_id: Optional[int]) -> List[FacetKey]:
+    """The facets an article with this category and source counts towards."""
+    keys = [TOTAL_KEY, (ArticleFacet.CATEGORY, category or '')]
+    if news_source_id is not None:
+        keys.append((ArticleFacet.SOURCE, str(news_source_id)))
+    return keys
+
+
+class FacetDelta:
+    """Count changes and newest publication times collected for one write."""
+
+    def __init__(self):
+        self.counts: Dict[FacetKey, int] = defaultdict(int)
+        self.latest: Dict[FacetKey, datetime] = {}
+        # Newest publication time removed from each facet, which may have been its latest
+        self.removed: Dict[FacetKey, datetime] = {}
+
+    def add(self, category: str, news_source_id: Optional[int], published_at: datetime) -> None:
+        for key in facet_keys(category, news_source_id):
+            self.counts[key] += 1
+            if key not in self.latest or published_at > self.latest[key]:
+                self.latest[key] = published_at
+
+    def remove(self, category: str, news_source_id: Optional[int], published_at: datetime) -> None:
+        for key in facet_keys(category, news_source_id):
+            self.counts[key] -= 1
+            if key not in self.removed or published_at > self.removed[key]:
+                self.removed[key] = published_at
+
+    def apply(self) -> None:
+        """Write the changes with one increment per touched facet."""
+        keys = {key for key, delta in self.counts.items() if delta} | set(self.latest)
+        if keys:
+            self._apply_changes(keys)
+
+        # Unless something at least as new replaced it, a removed article may have been the latest
+        refresh_latest(
+            (key, published_at) for key, published_at in self.removed.items()
+            if key not in self.latest or self.latest[key] < published_at
+        )
+
+    def _apply_changes(self, keys) -> None:
+        ArticleFacet.objects.bulk_create(
+            [ArticleFacet(kind=kind, value=value) for kind, value in keys],
+            ignore_conflicts=True
+        )
+        for kind, value in keys:
+            changes = {}
+            delta = self.counts.get((kind, value), 0)
+            if delta:
+                # Never below zero, even if the table drifted
+                changes['article_count'] = Greatest(F('article_count') + delta, Value(0))
+            latest = self.latest.get((kind, value))
+            if latest is not None:
+                latest = Value(latest, output_field=DateTimeField())
+                changes['latest_published_at'] = Greatest(Coalesce('latest_published_at', latest), latest)
+            if changes:
+                ArticleFacet.objects.filter(kind=kind, value=value).update(**changes)
+
+
+def _articles_for(key: FacetKey, articles):
+    kind, value = key
+    if kind == ArticleFacet.CATEGORY:
+        return articles.filter(category=value)
+    if kind == ArticleFacet.SOURCE:
+        return articles.filter(news_source_id=int(value))
+    return articles
+
+
+def refresh_latest(removed: Iterable[Tuple[FacetKey, datetime]]) -> None:
+    """Recompute the newest article of facets whose newest article may have been removed."""
+    for key, published_at in removed:
+        facet = ArticleFacet.objects.filter(kind=key[0], value=key[1], latest_published_at__lte=published_at)
+        if facet.exists():
+            latest = _articles_for(key, NewsArticle.objects.filter(duplicate_of__isnull=True).order_by())\
+                .aggregate(latest=Max('published_at'))
+            facet.update(latest_published_at=latest['latest'])
+
+
+def article_deleted(sender, instance, **kwargs):
+    """post_delete handler for NewsArticle."""
+    if instance.duplicate_of_id is not None:
+        # Only the representative of a story is counted
+        return
+    delta = FacetDelta()
+    delta.remove(instance.category, instance.news_source_id, instance.published_at)
+    delta.apply()
+    news_cache.invalidate_articles()
+
+
+def source_deleted(sender, instance, **kwargs):
+    """post_delete handler for NewsSource; its articles are unlinked, not deleted."""
+    ArticleFacet.objects.filter(kind=ArticleFacet.SOURCE, value=str(instance.pk)).delete()
+
+
+def rebuild() -> int:
+    """Recount every facet from the article table, returning how many were written."""
+    articles = NewsArticle.objects.filter(duplicate_of__isnull=True).order_by()
+    total = articles.aggregate(count=Count('id'), latest=Max('published_at'))
+    facets = [ArticleFacet(kind=ArticleFacet.TOTAL, value='', article_count=total['count'],
+                           latest_published_at=total['latest'])]
+    for category, count, latest in articles.values_list('category')\
+                                           .annotate(count=Count('id'), latest=Max('published_at'))\
+                                           .values_list('category', 'count', 'latest'):
+        facets.append(ArticleFacet(kind=ArticleFacet.CATEGORY, value=category or '', article_count=count,
+                                   latest_published_at=latest))
+    for source_id, count, latest in articles.filter(news_source__isnull=False).values_list('news_source_id')\
+                                            .annotate(count=Count('id'), latest=Max('published_at'))\
+                                            .values_list('news_source_id', 'count', 'latest'):
+        facets.append(ArticleFacet(kind=ArticleFacet.SOURCE, value=str(source_id), article_count=count,
+                                   latest_published_at=latest))
+
+    with transaction.atomic():
+        ArticleFacet.objects.all().delete()
+        ArticleFacet.objects.bulk_create(facets)
+    return len(facets)
+
+
+def _count(kind: str, value: str):
+    return ArticleFacet.objects.filter(kind=kind, value=value).values_list('article_count', flat=True)
+
+
+async def aget_count(kind: str = ArticleFacet.TOTAL, value: str = '') -> int:
+    """Articles counted under one facet; the total by default."""
+    return await _count(kind, value).afirst() or 0
+
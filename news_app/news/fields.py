@@ -0,0 +1,30 @@
+# news/fields.py
+from django.db import models
+from . import compression
+
+
+class CompressedTextField(models.TextField):
+    """
+    A TextField stored compressed in a binary column (see compression.py).
+
+    Values are compressed on save. They are decompressed in from_db_value as
+    each row is read, into a model instance or a values() row alike, not when
+    the attribute is first used; only queries that leave the column out, like
+    the article listings, skip the work. Only whole values can be compared: the
+    stored bytes do not support contains, startswith or other text lookups.
+    """
+    description = 'Text stored compressed'
+
+    def get_internal_type(self):
+        return 'BinaryField'
+
+    def get_db_prep_value(self, value, connection, prepared=False):
+        value = super().get_db_prep_value(value, connection, prepared)
+        if value is None:
+            return None
+        return connection.Database.Binary(compression.compress(value))
+
+    def from_db_value(self, value, expression, connection):
+        if value is None:
+            return value
+        return compression.decompress(value)
@@ -0,0 +1,34 @@
+# news/leases.py
+from datetime import timedelta
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+from .models import Lease
+
+
+def acquire(name: str, holder: str, timeout: float) -> bool:
+    """Take the named lease for timeout seconds unless someone else holds an unexpired one."""
+    now = timezone.now()
+    expires_at = now + timedelta(seconds=timeout)
+    # A single conditional UPDATE, so two processes cannot both take over an expired lease
+    taken = Lease.objects.filter(Q(expires_at__lte=now) | Q(holder=holder), name=name)\
+                         .update(holder=holder, expires_at=expires_at)
+    if taken:
+        return True
+    try:
+        with transaction.atomic():
+            Lease.objects.create(name=name, holder=holder, expires_at=expires_at)
+        return True
+    except IntegrityError:
+        # Held by someone else, or created by a competitor just now
+        return False
+
+
+def renew(name: str, holder: str, timeout: float) -> bool:
+    """Extend a lease this holder still has; False if it expired and was taken over."""
+    return bool(Lease.objects.filter(name=name, holder=holder)
+                .update(expires_at=timezone.now() + timedelta(seconds=timeout)))
+
+
+def release(name: str, holder: str) -> None:
+    Lease.objects.filter(name=name, holder=holder).delete()
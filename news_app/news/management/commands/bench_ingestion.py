@@ -0,0 +1,51 @@
+import json
+from django.core.management.base import BaseCommand
+from news.benchmarks.runner import run_benchmark
+
+class Command(BaseCommand):
+    help = 'Benchmark feed ingestion offline against the recorded fixture corpus'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--latency', type=float, default=0.0, help='Seconds the fixture server waits per response')
+        parser.add_argument('--error-rate', type=float, default=0.0,
+                            help='Share of requests the fixture server fails with a 503')
+        parser.add_argument('--seed', type=int, default=0, help='Seed for the injected failures')
+        parser.add_argument('--passes', type=int, default=2,
+                            help='Ingestion passes; the first starts from an empty database')
+        parser.add_argument('--detail-articles', type=int, default=20,
+                            help='Articles fetched one at a time through fetch_article_content')
+        parser.add_argument('--workers', type=int, help='Global number of concurrent downloads')
+        parser.add_argument('--per-host', type=int, help='Maximum concurrent downloads per host')
+        parser.add_argument('--extract-workers', type=int,
+                            help='Processes extracting article HTML (0 extracts on the fetch threads)')
+        parser.add_argument('--output', help='Write the JSON report to this file as well')
+
+    def handle(self, *args, **options):
+        report = run_benchmark(
+            latency=options['latency'],
+            error_rate=options['error_rate'],
+            seed=options['seed'],
+            passes=max(1, options['passes']),
+            workers=options['workers'],
+            per_host=options['per_host'],
+            extract_workers=options['extract_workers'],
+            detail_articles=options['detail_articles']
+        )
+
+        for result in report['passes']:
+            self.stdout.write(
+                f"{result['name']}: {result['feeds_per_sec']} feeds/sec, {result['articles_per_sec']} articles/sec, "
+                f"{result['queries_per_article']} queries/article in {result['elapsed']}s"
+            )
+        detail = report['detail']
+        self.stdout.write(f"detail: {detail['articles_per_sec']} articles/sec, {detail['mean_latency_ms']} ms/article")
+        concurrent = report['concurrent_detail']
+        self.stdout.write(f"concurrent detail: {concurrent['articles_per_sec']} articles/sec")
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(output + '\n')
+            self.stdout.write(self.style.SUCCESS(f"Report written to {options['output']}"))
+        else:
+            self.stdout.write(output)
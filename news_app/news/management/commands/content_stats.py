@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+from news.compression import CompressionStats
+from news.models import NewsArticle
+
+class Command(BaseCommand):
+    help = 'Report how well the stored article content compresses, per codec'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Rows read per query')
+
+    def handle(self, *args, **options):
+        stats = CompressionStats()
+        table = connection.ops.quote_name(NewsArticle._meta.db_table)
+        column = connection.ops.quote_name(NewsArticle._meta.get_field('content').column)
+
+        # The stored bytes are read directly, since the field hands back decompressed text
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT {column} FROM {table}")
+            while True:
+                rows = cursor.fetchmany(options['batch_size'])
+                if not rows:
+                    break
+                for (data,) in rows:
+                    stats.add(data)
+
+        for name in sorted(stats.rows):
+            stored, original = stats.stored_bytes[name], stats.original_bytes[name]
+            self.stdout.write(
+                f"{name}: {stats.rows[name]} rows, {original} bytes in {stored} stored"
+                f"{f' ({original / stored:.2f}x)' if stored else ''}"
+            )
+        ratio = stats.ratio
+        self.stdout.write(self.style.SUCCESS(
+            f"Compression ratio: {ratio:.2f}x" if ratio is not None else 'No article content stored'
+        ))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from news import metrics
+from news.utils.feed_parser import FeedParser
+
+class Command(BaseCommand):
+    help = 'Fetch every RSS feed concurrently and store the articles'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, help='Global number of concurrent downloads')
+        parser.add_argument('--per-host', type=int, help='Maximum concurrent downloads per host')
+        parser.add_argument('--extract-workers', type=int,
+                            help='Processes extracting article HTML (0 extracts on the fetch threads)')
+        parser.add_argument('--force', action='store_true', help='Re-download articles that are already stored')
+
+    def handle(self, *args, **options):
+        parser = FeedParser(max_workers=options['workers'], per_host_limit=options['per_host'],
+                            force=options['force'], extract_workers=options['extract_workers'])
+        stats = parser.fetch_all_feeds()
+        metrics.publish('fetch_feeds')
+        self.stdout.write(self.style.SUCCESS(f'Feed refresh finished: {stats.summary()}'))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from news import cache as news_cache
+from news import facets
+
+class Command(BaseCommand):
+    help = 'Recount the per-category and per-source article facets from the article table'
+
+    def handle(self, *args, **options):
+        written = facets.rebuild()
+        news_cache.invalidate_articles()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {written} facets'))
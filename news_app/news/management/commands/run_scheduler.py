@@ -0,0 +1,33 @@
+import signal
+from django.core.management.base import BaseCommand, CommandError
+from news.utils.feed_parser import FeedParser
+from news.utils.scheduler import FeedScheduler, SchedulerLocked
+
+class Command(BaseCommand):
+    help = 'Run the background ingestion scheduler that refreshes RSS feeds as they come due'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Fetch one batch of due feeds and exit')
+        parser.add_argument('--interval', type=int, help='Starting seconds between refreshes of a feed')
+        parser.add_argument('--workers', type=int, help='Global number of concurrent downloads')
+        parser.add_argument('--per-host', type=int, help='Maximum concurrent downloads per host')
+        parser.add_argument('--extract-workers', type=int,
+                            help='Processes extracting article HTML (0 extracts on the fetch threads)')
+
+    def handle(self, *args, **options):
+        parser = FeedParser(max_workers=options['workers'], per_host_limit=options['per_host'],
+                            extract_workers=options['extract_workers'])
+        scheduler = FeedScheduler(parser=parser, interval=options['interval'])
+
+        def shutdown(signum, frame):
+            self.stdout.write(self.style.WARNING('Stopping after the current batch...'))
+            scheduler.stop()
+
+        signal.signal(signal.SIGINT, shutdown)
+        signal.signal(signal.SIGTERM, shutdown)
+
+        try:
+            scheduler.run(once=options['once'])
+        except SchedulerLocked as e:
+            raise CommandError(str(e))
+        self.stdout.write(self.style.SUCCESS('Scheduler stopped'))
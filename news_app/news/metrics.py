@@ -0,0 +1,290 @@
+# news/metrics.py
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from urllib.parse import urlsplit
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+
+# Ingestion runs in management commands rather than the web server, so those
+# processes publish a snapshot of their metrics to the shared cache and the
+# /metrics view renders them next to its own.
+SNAPSHOT_KEY = 'news:metrics:snapshot:{}'
+# Processes whose published snapshots the /metrics view includes
+PUBLISHING_PROCESSES = ('scheduler', 'fetch_feeds')
+LOCAL_PROCESS = 'web'
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Registry:
+    """The metrics of this process, rendered in the Prometheus text format."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f'Metric {metric.name} is already registered')
+            self._metrics[metric.name] = metric
+        return metric
+
+    def snapshot(self):
+        """Plain picklable families: {name: {'kind', 'help', 'samples': [(name, labels, value)]}}."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {
+            metric.name: {'kind': metric.kind, 'help': metric.documentation, 'samples': metric.samples()}
+            for metric in metrics
+        }
+
+
+registry = Registry()
+
+
+class Metric:
+    kind = 'untyped'
+
+    def __init__(self, name, documentation, labelnames=(), registry=registry):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        registry.register(self)
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f'{self.name} expects labels {self.labelnames}, got {tuple(labels)}')
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key, *extra):
+        return tuple(zip(self.labelnames, key)) + extra
+
+
+class Counter(Metric):
+    """A value that only goes up, per combination of label values."""
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = sorted(self._values.items())
+        return [(f'{self.name}_total', self._labels(key), value) for key, value in values]
+
+
+class Histogram(Metric):
+    """Observations counted into cumulative buckets, with their sum and count."""
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DURATION_BUCKETS, registry=registry):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # Per-bucket counts (the last one is +Inf), then the sum
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][bisect.bisect_left(self.buckets, value)] += 1
+            state[1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self):
+        with self._lock:
+            values = sorted((key, (list(counts), total)) for key, (counts, total) in self._values.items())
+        samples = []
+        for key, (counts, total) in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                samples.append((f'{self.name}_bucket', self._labels(key, ('le', _format_value(bound))), cumulative))
+            samples.append((f'{self.name}_sum', self._labels(key), total))
+            samples.append((f'{self.name}_count', self._labels(key), cumulative))
+        return samples
+
+
+# Ingestion stages: feed_fetch, xml_parse, article_fetch, html_extract and db_write
+STAGE_DURATION = Histogram('news_stage_duration_seconds', 'Time spent in each ingestion stage.', ['stage'])
+STAGE_ERRORS = Counter('news_stage_errors', 'Failures in each ingestion stage by exception type.',
+                       ['stage', 'exception'])
+DOWNLOAD_BYTES = Counter('news_download_bytes', 'Response body bytes read.', ['stage'])
+HOST_DURATION = Histogram('news_host_download_duration_seconds',
+                          'Time from request to last body byte, per configured feed site; "other" for the rest.',
+                          ['stage', 'host'])
+ARTICLES_WRITTEN = Counter('news_articles_written', 'Articles written to the database.', ['result'])
+DETAIL_LOOKUPS = Counter('news_article_detail_lookups',
+                         'Article detail lookups by where the content came from: cache_hit, db_hit or miss.',
+                         ['outcome'])
+
+VIEW_DURATION = Histogram('news_view_duration_seconds', 'Time to build a response.', ['view'])
+VIEW_QUERIES = Histogram('news_view_queries', 'Database queries per request.', ['view'], buckets=QUERY_BUCKETS)
+VIEW_REQUESTS = Counter('news_view_requests', 'Requests by response status.', ['view', 'status'])
+
+
+# Sites of the configured feeds, the only hosts HOST_DURATION gets a series for:
+# feeds link to articles anywhere, and a series per host would grow without bound
+_feed_sites = set()
+OTHER_HOST = 'other'
+# Subdomains feeds and article pages are served from besides the site itself
+SITE_HOST_PREFIXES = ('www.', 'feeds.', 'feed.', 'rss.')
+
+
+def _site(url):
+    host = (urlsplit(url).hostname or '').lower()
+    for prefix in SITE_HOST_PREFIXES:
+        if host.startswith(prefix):
+            return host[len(prefix):]
+    return host
+
+
+def track_feed_sites(urls):
+    """Give downloads from the sites of these feed URLs their own HOST_DURATION series."""
+    _feed_sites.update(_site(url) for url in urls)
+
+
+def host_label(url):
+    """The host label of a download: its feed site, or OTHER_HOST for any other host."""
+    site = _site(url)
+    return site if site in _feed_sites else OTHER_HOST
+
+
+def count_error(stage, error):
+    """Count a failure of stage; error is an exception or the name of one."""
+    STAGE_ERRORS.inc(stage=stage, exception=error if isinstance(error, str) else type(error).__name__)
+
+
+@contextmanager
+def errors(stage):
+    """Count exceptions escaping the block against stage, then re-raise them."""
+    try:
+        yield
+    except Exception as e:
+        count_error(stage, e)
+        raise
+
+
+@contextmanager
+def stage(name):
+    """Time the block as one run of an ingestion stage and count its failures."""
+    with STAGE_DURATION.time(stage=name), errors(name):
+        yield
+
+
+# Query count of the instrumented request running in this context. Async views
+# run their queries in sync_to_async threads, which get a copy of the context
+# but their own connection, so the counter is found through the context rather
+# than through a wrapper installed on the request's connection.
+_view_queries = ContextVar('news_view_queries', default=None)
+
+
+def count_view_query(execute, sql, params, many, context):
+    queries = _view_queries.get()
+    if queries is not None:
+        queries[0] += 1
+    return execute(sql, params, many, context)
+
+
+def install_query_counter(sender, connection, **kwargs):
+    """connection_created handler that lets instrument_view count the queries on every connection."""
+    if count_view_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(count_view_query)
+
+
+@contextmanager
+def _observe_request(name):
+    """Time a request to a view and count its queries; the caller fills in the status."""
+    queries = [0]
+    outcome = {'status': 500}
+    token = _view_queries.set(queries)
+    try:
+        with VIEW_DURATION.time(view=name):
+            yield outcome
+    finally:
+        _view_queries.reset(token)
+        VIEW_QUERIES.observe(queries[0], view=name)
+        VIEW_REQUESTS.inc(view=name, status=outcome['status'])
+
+
+def instrument_view(name):
+    """Record the latency, query count and status of every request to a view, sync or async."""
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                with _observe_request(name) as outcome:
+                    response = await view(request, *args, **kwargs)
+                    outcome['status'] = response.status_code
+                    return response
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            with _observe_request(name) as outcome:
+                response = view(request, *args, **kwargs)
+                outcome['status'] = response.status_code
+                return response
+        return wrapper
+    return decorator
+
+
+def publish(process):
+    """Share this process's metrics with the /metrics view through the cache."""
+    cache.set(SNAPSHOT_KEY.format(process), registry.snapshot(),
+              getattr(settings, 'NEWS_METRICS_SNAPSHOT_TTL', 3600))
+
+
+def render():
+    """Prometheus text exposition of this process and the published snapshots."""
+    snapshots = {LOCAL_PROCESS: registry.snapshot()}
+    published = cache.get_many([SNAPSHOT_KEY.format(process) for process in PUBLISHING_PROCESSES])
+    for process in PUBLISHING_PROCESSES:
+        snapshot = published.get(SNAPSHOT_KEY.format(process))
+        if snapshot:
+            snapshots[process] = snapshot
+
+    lines = []
+    for name, family in snapshots[LOCAL_PROCESS].items():
+        lines.append(f'# HELP {name} {family["help"]}')
+        lines.append(f'# TYPE {name} {family["kind"]}')
+        for process, snapshot in snapshots.items():
+            for sample, labels, value in snapshot.get(name, {}).get('samples', []):
+                labels = (('process', process),) + tuple(labels)
+                lines.append(f'{sample}{_format_labels(labels)} {_format_value(value)}')
+    return '\n'.join(lines) + '\n'
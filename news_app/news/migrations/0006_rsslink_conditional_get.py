@@ -0,0 +1,28 @@
+# Generated by Django 5.1.2 on 2026-10-18 06:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0005_customfeed'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rsslink',
+            name='etag',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='rsslink',
+            name='last_fetched',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='rsslink',
+            name='last_modified',
+            field=models.CharField(blank=True, default='', max_length=100),
+        ),
+    ]
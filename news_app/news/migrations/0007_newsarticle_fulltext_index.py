@@ -0,0 +1,58 @@
+# Generated by Django 5.1.2 on 2026-10-18 06:19
+
+from django.db import migrations
+from django.utils.html import strip_tags
+
+# The index as first created; 0019 makes it contentless. Inlined so the
+# migration does not change with news.search.
+FTS_TABLE = 'news_article_fts'
+CREATE_FTS_SQL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} "
+    "USING fts5(title, summary, content, tokenize='unicode61 remove_diacritics 2')"
+)
+DROP_FTS_SQL = f"DROP TABLE IF EXISTS {FTS_TABLE}"
+INSERT_SQL = f"INSERT INTO {FTS_TABLE} (rowid, title, summary, content) VALUES (%s, %s, %s, %s)"
+
+
+def index_batch(schema_editor, batch):
+    rows = [
+        (article_id, title or '', strip_tags(summary or ''), strip_tags(content or ''))
+        for article_id, title, summary, content in batch
+    ]
+    with schema_editor.connection.cursor() as cursor:
+        cursor.executemany(INSERT_SQL, rows)
+
+
+def create_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+
+    NewsArticle = apps.get_model('news', 'NewsArticle')
+    schema_editor.execute(CREATE_FTS_SQL)
+    rows = NewsArticle.objects.using(schema_editor.connection.alias)\
+        .values_list('id', 'title', 'summary', 'content')\
+        .iterator(chunk_size=1000)
+
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= 1000:
+            index_batch(schema_editor, batch)
+            batch = []
+    index_batch(schema_editor, batch)
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(DROP_FTS_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0006_rsslink_conditional_get'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.2 on 2026-10-18 06:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0007_newsarticle_fulltext_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='newsarticle',
+            index=models.Index(fields=['-published_at', '-id'], name='article_published_id_idx'),
+        ),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 5.1.2 on 2026-10-18 06:25
+
+from collections import defaultdict
+from urllib.parse import urlsplit
+from django.db import migrations
+
+BATCH_SIZE = 500
+
+# Subdomains that feeds are often served from instead of the site's own host
+FEED_HOST_PREFIXES = ('www.', 'feeds.', 'feed.', 'rss.')
+
+
+def _site_host(url):
+    host = (urlsplit(url).hostname or '').lower()
+    for prefix in FEED_HOST_PREFIXES:
+        if host.startswith(prefix):
+            return host[len(prefix):]
+    return host
+
+
+def backfill_sources(apps, schema_editor):
+    """
+    Link existing articles to their source. The legacy fetcher stored the feed
+    URL in NewsArticle.source, custom feeds expect the NewsSource name. The
+    feed parser stores the page's og:site_name instead, so the rest are matched
+    by the host of the article URL against the hosts of the feed URLs, when
+    that host belongs to a single source (and to a single feed, for rss_link).
+    """
+    db = schema_editor.connection.alias
+    NewsArticle = apps.get_model('news', 'NewsArticle')
+    NewsSource = apps.get_model('news', 'NewsSource')
+    RSSLink = apps.get_model('news', 'RSSLink')
+
+    links = {url: (link_id, source_id)
+             for link_id, url, source_id in RSSLink.objects.using(db).values_list('id', 'url', 'source_id')}
+    sources = dict(NewsSource.objects.using(db).values_list('name', 'id'))
+
+    unlinked = NewsArticle.objects.using(db).filter(news_source__isnull=True)
+    for source in unlinked.values_list('source', flat=True).distinct().iterator():
+        if source in links:
+            link_id, source_id = links[source]
+            unlinked.filter(source=source).update(rss_link_id=link_id, news_source_id=source_id)
+        elif source in sources:
+            unlinked.filter(source=source).update(news_source_id=sources[source])
+
+    links_by_host = defaultdict(set)
+    for url, (link_id, source_id) in links.items():
+        links_by_host[_site_host(url)].add((link_id, source_id))
+
+    ids_by_host = defaultdict(list)
+    for article_id, url in unlinked.values_list('id', 'url').iterator():
+        ids_by_host[_site_host(url)].append(article_id)
+    for host, article_ids in ids_by_host.items():
+        host_links = links_by_host.get(host, set())
+        source_ids = {source_id for _, source_id in host_links}
+        if len(source_ids) != 1:
+            continue
+        update = {'news_source_id': source_ids.pop()}
+        if len(host_links) == 1:
+            update['rss_link_id'] = next(iter(host_links))[0]
+        for start in range(0, len(article_ids), BATCH_SIZE):
+            unlinked.filter(id__in=article_ids[start:start + BATCH_SIZE]).update(**update)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0009_newsarticle_source_fk'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_sources, migrations.RunPython.noop),
+    ]
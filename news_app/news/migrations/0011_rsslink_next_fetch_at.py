@@ -0,0 +1,18 @@
+# Generated by Django 5.1.2 on 2026-10-18 06:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0010_backfill_newsarticle_source_fk'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rsslink',
+            name='next_fetch_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+    ]
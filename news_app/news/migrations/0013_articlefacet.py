@@ -0,0 +1,26 @@
+# Generated by Django 5.1.2 on 2026-10-18 06:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0012_rsslink_polling_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArticleFacet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('total', 'Total'), ('category', 'Category'), ('source', 'Source')], max_length=20)),
+                ('value', models.CharField(blank=True, default='', max_length=200)),
+                ('article_count', models.PositiveIntegerField(default=0)),
+                ('latest_published_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('kind', 'value'), name='article_facet_kind_value_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.1.2 on 2026-10-18 06:36
+
+from django.db import migrations
+from django.db.models import Count, Max
+
+
+def backfill_facets(apps, schema_editor):
+    """Count the articles already stored; ingestion keeps the facets in step from here on."""
+    db = schema_editor.connection.alias
+    NewsArticle = apps.get_model('news', 'NewsArticle')
+    ArticleFacet = apps.get_model('news', 'ArticleFacet')
+
+    articles = NewsArticle.objects.using(db).order_by()
+    total = articles.aggregate(count=Count('id'), latest=Max('published_at'))
+    facets = [ArticleFacet(kind='total', value='', article_count=total['count'],
+                           latest_published_at=total['latest'])]
+    for category, count, latest in articles.values_list('category')\
+                                           .annotate(count=Count('id'), latest=Max('published_at'))\
+                                           .values_list('category', 'count', 'latest'):
+        facets.append(ArticleFacet(kind='category', value=category or '', article_count=count,
+                                   latest_published_at=latest))
+    for source_id, count, latest in articles.filter(news_source__isnull=False).values_list('news_source_id')\
+                                            .annotate(count=Count('id'), latest=Max('published_at'))\
+                                            .values_list('news_source_id', 'count', 'latest'):
+        facets.append(ArticleFacet(kind='source', value=str(source_id), article_count=count,
+                                   latest_published_at=latest))
+    ArticleFacet.objects.using(db).bulk_create(facets)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0013_articlefacet'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_facets, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.1.2 on 2026-10-18 06:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0014_backfill_articlefacet'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='URLAlias',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('alias', models.URLField(unique=True)),
+                ('canonical_url', models.URLField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
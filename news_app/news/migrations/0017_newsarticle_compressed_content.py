@@ -0,0 +1,19 @@
+# Generated by Django 5.1.2 on 2026-10-18 06:49
+
+import news.fields
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0016_newsarticle_simhash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='newsarticle',
+            name='compressed_content',
+            field=news.fields.CompressedTextField(null=True),
+        ),
+    ]
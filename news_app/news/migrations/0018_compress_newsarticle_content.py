@@ -0,0 +1,76 @@
+# Generated by Django 5.1.2 on 2026-10-18 06:52
+
+import news.fields
+from django.db import migrations, transaction
+
+BATCH_SIZE = 500
+
+
+def _copy_in_batches(apps, schema_editor, source, target):
+    """
+    Copy one content column into the other through the fields, in batches of
+    ids so only one batch of articles is held in memory and each write
+    transaction stays short.
+    """
+    db = schema_editor.connection.alias
+    NewsArticle = apps.get_model('news', 'NewsArticle')
+
+    last_id = 0
+    while True:
+        batch = list(NewsArticle.objects.using(db).filter(id__gt=last_id).order_by('id')
+                     .only('id', source)[:BATCH_SIZE])
+        if not batch:
+            break
+        for article in batch:
+            setattr(article, target, getattr(article, source))
+        with transaction.atomic(using=db):
+            NewsArticle.objects.using(db).bulk_update(batch, [target])
+        last_id = batch[-1].id
+
+
+def compress_content(apps, schema_editor):
+    """
+    Write every article's text into the compressed column added by 0017. The
+    text column is read as text and the new column written as bytes, so no
+    backend has to convert between the two.
+    """
+    _copy_in_batches(apps, schema_editor, 'content', 'compressed_content')
+
+
+def decompress_content(apps, schema_editor):
+    _copy_in_batches(apps, schema_editor, 'compressed_content', 'content')
+
+
+def vacuum(apps, schema_editor):
+    """Give the pages freed by compression back to the filesystem; SQLite keeps them otherwise."""
+    if schema_editor.connection.vendor == 'sqlite':
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute('VACUUM')
+
+
+class Migration(migrations.Migration):
+    # Each batch commits on its own, and VACUUM cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('news', '0017_newsarticle_compressed_content'),
+    ]
+
+    operations = [
+        migrations.RunPython(compress_content, decompress_content),
+        migrations.RemoveField(
+            model_name='newsarticle',
+            name='content',
+        ),
+        migrations.RenameField(
+            model_name='newsarticle',
+            old_name='compressed_content',
+            new_name='content',
+        ),
+        migrations.AlterField(
+            model_name='newsarticle',
+            name='content',
+            field=news.fields.CompressedTextField(default='Default content goes here.'),
+        ),
+        migrations.RunPython(vacuum, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.1.2 on 2026-10-18 06:57
+
+import sqlite3
+
+from django.db import migrations, transaction
+from django.utils.html import strip_tags
+
+FTS_TABLE = 'news_article_fts'
+TOKENIZE = "tokenize='unicode61 remove_diacritics 2'"
+# Only rowids are read back, so the index need not keep a copy of the text;
+# contentless_delete (SQLite 3.43+) lets rows be replaced by rowid
+CONTENTLESS_OPTIONS = "content=''" + (", contentless_delete=1" if sqlite3.sqlite_version_info >= (3, 43, 0) else "")
+INSERT_SQL = f"INSERT INTO {FTS_TABLE} (rowid, title, summary, content) VALUES (%s, %s, %s, %s)"
+BATCH_SIZE = 1000
+
+
+def recreate_index(apps, schema_editor, options):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+
+    db = schema_editor.connection.alias
+    NewsArticle = apps.get_model('news', 'NewsArticle')
+    with transaction.atomic(using=db):
+        schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+        schema_editor.execute(f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(title, summary, content, {options})")
+
+    last_id = 0
+    while True:
+        batch = list(NewsArticle.objects.using(db).filter(id__gt=last_id)
+                     .order_by('id').values_list('id', 'title', 'summary', 'content')[:BATCH_SIZE])
+        if not batch:
+            break
+        with transaction.atomic(using=db), schema_editor.connection.cursor() as cursor:
+            cursor.executemany(INSERT_SQL, [
+                (article_id, title or '', strip_tags(summary or ''), strip_tags(content or ''))
+                for article_id, title, summary, content in batch
+            ])
+        last_id = batch[-1][0]
+
+    # Give the pages of the dropped copy back to the filesystem
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute('VACUUM')
+
+
+def make_contentless(apps, schema_editor):
+    recreate_index(apps, schema_editor, f"{CONTENTLESS_OPTIONS}, {TOKENIZE}")
+
+
+def keep_content(apps, schema_editor):
+    recreate_index(apps, schema_editor, TOKENIZE)
+
+
+class Migration(migrations.Migration):
+    # VACUUM cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('news', '0018_compress_newsarticle_content'),
+    ]
+
+    operations = [
+        migrations.RunPython(make_contentless, keep_content),
+    ]
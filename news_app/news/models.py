@@ -1,4 +1,5 @@
 from django.db import models
+from .fields import CompressedTextField
 
 class NewsSource(models.Model):
     name = models.CharField(max_length=100, unique=True)
@@ -12,6 +13,17 @@ class RSSLink(models.Model):
     source = models.ForeignKey(NewsSource, on_delete=models.CASCADE, related_name='links')
     url = models.URLField()
     created_at = models.DateTimeField(auto_now_add=True)
+    # Validators from the last successful fetch, sent back as a conditional GET
+    etag = models.CharField(max_length=255, blank=True, default='')
+    last_modified = models.CharField(max_length=100, blank=True, default='')
+    last_fetched = models.DateTimeField(null=True, blank=True)
+    # When the ingestion scheduler should poll this feed next; null means as soon as possible
+    next_fetch_at = models.DateTimeField(null=True, blank=True, db_index=True)
+    # Polling statistics the scheduler learns the next interval from
+    poll_interval = models.PositiveIntegerField(null=True, blank=True)  # seconds
+    arrival_rate = models.FloatField(default=0.0)  # new items per hour, smoothed
+    hit_ratio = models.FloatField(default=0.0)  # share of polls that returned new items, smoothed
+    consecutive_failures = models.PositiveIntegerField(default=0)
 
     def __str__(self):
         return self.url
@@ -35,18 +47,102 @@ class NewsArticle(models.Model):
     title = models.CharField(max_length=500)
     url = models.URLField(unique=True)
     summary = models.TextField()
-    content = models.TextField(default="Default content goes here.")
+    # Compressed; the bulk of the database (see fields.py)
+    content = CompressedTextField(default="Default content goes here.")
     published_at = models.DateTimeField()
     source = models.CharField(max_length=200)
+    # Feed the article was ingested from; source keeps the publisher's display name
+    news_source = models.ForeignKey(NewsSource, on_delete=models.SET_NULL, null=True, blank=True,
+                                    related_name='articles')
+    rss_link = models.ForeignKey(RSSLink, on_delete=models.SET_NULL, null=True, blank=True,
+                                 related_name='articles')
     category = models.CharField(max_length=100, default='General')
     created_at = models.DateTimeField(auto_now_add=True)
+    # SimHash of the extracted text (see utils/simhash.py), stored signed, and its
+    # four 16-bit bands; near-duplicates share at least one band exactly
+    simhash = models.BigIntegerField(null=True, blank=True)
+    simhash_band0 = models.PositiveIntegerField(null=True, blank=True)
+    simhash_band1 = models.PositiveIntegerField(null=True, blank=True)
+    simhash_band2 = models.PositiveIntegerField(null=True, blank=True)
+    simhash_band3 = models.PositiveIntegerField(null=True, blank=True)
+    # The article that represents this story in listings; null for representatives.
+    # Duplicates are stored without their full content.
+    duplicate_of = models.ForeignKey('self', on_delete=models.SET_NULL, null=True, blank=True,
+                                     related_name='duplicates')
 
     class Meta:
         ordering = ['-published_at']
+        indexes = [
+            # Keyset pagination walks this index in listing order
+            models.Index(fields=['-published_at', '-id'], name='article_published_id_idx'),
+            # Source, custom feed and category listings are range scans on these
+            models.Index(fields=['news_source', '-published_at'], name='article_source_published_idx'),
+            models.Index(fields=['category', '-published_at'], name='article_category_published_idx'),
+            # Near-duplicate candidates are looked up by band
+            models.Index(fields=['simhash_band0'], name='article_simhash_band0_idx'),
+            models.Index(fields=['simhash_band1'], name='article_simhash_band1_idx'),
+            models.Index(fields=['simhash_band2'], name='article_simhash_band2_idx'),
+            models.Index(fields=['simhash_band3'], name='article_simhash_band3_idx'),
+        ]
 
     def __str__(self):
         return self.title
 
+class URLAlias(models.Model):
+    """
+    Another URL a stored article was reached by, e.g. a syndicated copy's link or
+    the address before a redirect, so the story is never downloaded again.
+    """
+    alias = models.URLField(unique=True)
+    canonical_url = models.URLField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f'{self.alias} -> {self.canonical_url}'
+
+class ArticleFacet(models.Model):
+    """
+    Article count and newest publication time per category, per source and in
+    total, kept in step by ingestion and deletions so the filters and totals
+    never have to scan NewsArticle. Like the listings, it only counts the
+    representative of each story, not its duplicates.
+    """
+    TOTAL = 'total'
+    CATEGORY = 'category'
+    SOURCE = 'source'
+    KIND_CHOICES = [
+        (TOTAL, 'Total'),
+        (CATEGORY, 'Category'),
+        (SOURCE, 'Source'),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    # Category name, NewsSource id, or empty for the total
+    value = models.CharField(max_length=200, blank=True, default='')
+    article_count = models.PositiveIntegerField(default=0)
+    latest_published_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'value'], name='article_facet_kind_value_uniq'),
+        ]
+
+    def __str__(self):
+        return f'{self.kind}:{self.value}'
+
+class Lease(models.Model):
+    """
+    A named lock shared by every process using the database, such as the
+    ingestion scheduler's run lock. The holder renews it before expires_at;
+    after that anyone may take it over, so a crashed holder cannot keep it.
+    """
+    name = models.CharField(max_length=100, unique=True)
+    holder = models.CharField(max_length=64)
+    expires_at = models.DateTimeField()
+
+    def __str__(self):
+        return f'{self.name} held by {self.holder}'
+
 class CustomFeed(models.Model):
     name = models.CharField(max_length=100, unique=True)
     sources = models.ManyToManyField(NewsSource, related_name='custom_feeds')
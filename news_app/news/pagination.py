@@ -0,0 +1,94 @@
+# news/pagination.py
+import base64
+import json
+from datetime import datetime
+from typing import List, Optional, Tuple
+from django.db.models import Q
+
+# Listing order; keyset cursors point at a position in it
+ORDERING = ('-published_at', '-id')
+
+# The only columns a page of articles loads: what article_list.html renders
+# plus the cursor fields. Pages never read the article body, and a template
+# touching any other field would cost a query per article.
+LISTING_FIELDS = ('id', 'title', 'url', 'summary', 'source', 'category', 'published_at')
+
+# Largest primary key a signed 64-bit column holds
+MAX_ID = 2 ** 63
+
+
+def encode_cursor(article) -> str:
+    """Opaque cursor pointing just after the given article."""
+    raw = json.dumps([article.published_at.isoformat(), article.id])
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def encode_offset_cursor(offset: int) -> str:
+    """Opaque cursor for relevance-ranked results, which have no stable keyset."""
+    raw = json.dumps({'offset': offset})
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor: Optional[str]):
+    """Return (published_at, id), {'offset': n}, or None for a missing or malformed cursor."""
+    if not cursor:
+        return None
+    try:
+        value = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        if isinstance(value, dict):
+            return {'offset': max(int(value['offset']), 0)}
+        published_at, article_id = value
+        published_at, article_id = datetime.fromisoformat(published_at), int(article_id)
+        # Encoded cursors always hold an aware time and an id the database can store
+        if published_at.tzinfo is None or not 0 < article_id < MAX_ID:
+            raise ValueError('cursor out of range')
+        return published_at, article_id
+    except (ValueError, TypeError, KeyError):
+        return None
+
+
+def _after_cursor(queryset, cursor: Optional[str]):
+    """The listing in keyset order, starting just after the cursor."""
+    position = decode_cursor(cursor)
+    queryset = queryset.only(*LISTING_FIELDS).order_by(*ORDERING)
+    if isinstance(position, tuple):
+        published_at, article_id = position
+        queryset = queryset.filter(
+            Q(published_at__lt=published_at) | Q(published_at=published_at, id__lt=article_id)
+        )
+    return queryset
+
+
+def _keyset_result(articles: List, limit: int) -> Tuple[List, Optional[str]]:
+    if len(articles) <= limit:
+        return articles, None
+    articles = articles[:limit]
+    return articles, encode_cursor(articles[-1])
+
+
+async def akeyset_page(queryset, cursor: Optional[str], limit: int) -> Tuple[List, Optional[str]]:
+    """
+    Return one page of articles after the cursor and the cursor of the next page.
+
+    Each page is a range scan on (published_at, id), so deep pages cost the same
+    as the first one. The next cursor is None on the last page.
+    """
+    return _keyset_result([article async for article in _after_cursor(queryset, cursor)[:limit + 1]], limit)
+
+
+def _offset(cursor: Optional[str]) -> int:
+    position = decode_cursor(cursor)
+    return position['offset'] if isinstance(position, dict) else 0
+
+
+def _ranked_result(articles: List, offset: int, limit: int) -> Tuple[List, Optional[str]]:
+    if len(articles) <= limit:
+        return articles, None
+    return articles[:limit], encode_offset_cursor(offset + limit)
+
+
+async def aranked_page(queryset, cursor: Optional[str], limit: int) -> Tuple[List, Optional[str]]:
+    """Page through an already ordered, bounded result set such as search hits."""
+    offset = _offset(cursor)
+    page = queryset.only(*LISTING_FIELDS)[offset:offset + limit + 1]
+    return _ranked_result([article async for article in page], offset, limit)
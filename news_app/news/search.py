@@ -0,0 +1,149 @@
+# news/search.py
+import re
+import sqlite3
+from functools import lru_cache
+from typing import Iterable, List, Tuple
+from django.conf import settings
+from django.db import connection
+from django.utils.html import strip_tags
+
+# SQLite FTS5 index over article text, keyed by NewsArticle.id (the rowid)
+FTS_TABLE = 'news_article_fts'
+
+# Contentless: only rowids are ever read back, so the index keeps what matching
+# and ranking need rather than a second, uncompressed copy of every article.
+# From SQLite 3.43 rows can be deleted and replaced by rowid (contentless_delete);
+# before that FTS5 removes a row only when handed the values it was indexed with.
+CONTENTLESS_DELETE = sqlite3.sqlite_version_info >= (3, 43, 0)
+
+CREATE_FTS_SQL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} "
+    "USING fts5(title, summary, content, content=''"
+    + (", contentless_delete=1" if CONTENTLESS_DELETE else "")
+    + ", tokenize='unicode61 remove_diacritics 2')"
+)
+DROP_FTS_SQL = f"DROP TABLE IF EXISTS {FTS_TABLE}"
+
+# Relative weight of title, summary and content matches in the bm25 ranking
+RANK_WEIGHTS = (10.0, 3.0, 1.0)
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+Row = Tuple[int, str, str, str]
+
+
+@lru_cache(maxsize=None)
+def is_available() -> bool:
+    """Whether the full-text index exists on the default database."""
+    if connection.vendor != 'sqlite':
+        return False
+    return FTS_TABLE in connection.introspection.table_names()
+
+
+@lru_cache(maxsize=None)
+def deletes_by_rowid() -> bool:
+    """Whether the index was created with contentless_delete, so replaced rows need no previous values."""
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT sql FROM sqlite_master WHERE name = %s", [FTS_TABLE])
+        row = cursor.fetchone()
+    return bool(row) and 'contentless_delete' in row[0]
+
+
+def _index_rows(rows: Iterable[Row]) -> List[Row]:
+    return [
+        (article_id, title or '', strip_tags(summary or ''), strip_tags(content or ''))
+        for article_id, title, summary, content in rows
+    ]
+
+
+def previous_rows(articles) -> List[Row]:
+    """
+    The (id, title, summary, content) last indexed for a queryset of articles
+    about to be re-indexed, to pass to index_articles before they change.
+    Empty when the index deletes by rowid and does not need them.
+    """
+    if deletes_by_rowid():
+        return []
+    return list(articles.values_list('id', 'title', 'summary', 'content'))
+
+
+def index_articles(rows: Iterable[Row], previous: Iterable[Row] = ()) -> None:
+    """
+    Add or replace (id, title, summary, content) rows in the index; previous
+    holds the rows last indexed for the replaced ids (see previous_rows).
+    """
+    rows = _index_rows(rows)
+    if not rows:
+        return
+
+    with connection.cursor() as cursor:
+        if deletes_by_rowid():
+            cursor.executemany(
+                f"DELETE FROM {FTS_TABLE} WHERE rowid = %s",
+                [(row[0],) for row in rows]
+            )
+        else:
+            cursor.executemany(
+                f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, title, summary, content) "
+                "VALUES ('delete', %s, %s, %s, %s)",
+                _index_rows(previous)
+            )
+        cursor.executemany(
+            f"INSERT INTO {FTS_TABLE} (rowid, title, summary, content) VALUES (%s, %s, %s, %s)",
+            rows
+        )
+
+
+def build_match_query(query: str) -> str:
+    """Turn free text into an FTS5 query that requires every word, prefix-matching the last."""
+    tokens = TOKEN_RE.findall(query)
+    if not tokens:
+        return ''
+    terms = [f'"{token}"' for token in tokens]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def _match_sql(match: str, within) -> Tuple[str, list]:
+    """WHERE clause and params for rows matching the query, limited to the ids of a queryset."""
+    where, params = f"{FTS_TABLE} MATCH %s", [match]
+    if within is not None:
+        # Filters run before ranking and LIMIT, so no filtered match is cut off
+        subquery, subquery_params = within.order_by().values('id').query.sql_with_params()
+        where += f" AND rowid IN ({subquery})"
+        params.extend(subquery_params)
+    return where, params
+
+
+def search_article_ids(query: str, limit: int = None, within=None) -> List[int]:
+    """
+    Return ids of articles matching the query, best match first, at most limit
+    (NEWS_SEARCH_MAX_RESULTS by default). When within is a queryset of
+    articles, only those are searched.
+    """
+    match = build_match_query(query)
+    if not match:
+        return []
+
+    limit = limit or getattr(settings, 'NEWS_SEARCH_MAX_RESULTS', 500)
+    weights = ', '.join(str(weight) for weight in RANK_WEIGHTS)
+    where, params = _match_sql(match, within)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT rowid FROM {FTS_TABLE} WHERE {where} "
+            f"ORDER BY bm25({FTS_TABLE}, {weights}) LIMIT %s",
+            params + [limit]
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def count_matches(query: str, within=None) -> int:
+    """Number of articles matching the query, without the limit search_article_ids applies."""
+    match = build_match_query(query)
+    if not match:
+        return 0
+
+    where, params = _match_sql(match, within)
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT COUNT(*) FROM {FTS_TABLE} WHERE {where}", params)
+        return cursor.fetchone()[0]
@@ -0,0 +1,43 @@
+from unittest import mock
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from news import metrics
+from news.models import NewsArticle
+from news.utils import article_cache
+
+
+def lookups(outcome):
+    for sample, labels, value in metrics.DETAIL_LOOKUPS.samples():
+        if dict(labels) == {'outcome': outcome}:
+            return value
+    return 0
+
+
+class ArticleDetailLookupTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.before = {outcome: lookups(outcome) for outcome in ('cache_hit', 'db_hit', 'miss')}
+
+    def counted(self, outcome):
+        return lookups(outcome) - self.before[outcome]
+
+    async def test_stored_content_then_cache(self):
+        await NewsArticle.objects.acreate(title='Stored', url='https://example.com/a', summary='',
+                                          content='<p>Body</p>', source='Example', published_at=timezone.now())
+
+        self.assertEqual((await article_cache.aget_article_detail('https://example.com/a'))['content'], '<p>Body</p>')
+        self.assertEqual((await article_cache.aget_article_detail('https://example.com/a'))['content'], '<p>Body</p>')
+        self.assertEqual((self.counted('db_hit'), self.counted('cache_hit'), self.counted('miss')), (1, 1, 0))
+
+    async def test_live_fetch_is_a_miss(self):
+        fetched = {'title': 'Live', 'content': '<p>Live</p>', 'source': 'Example', 'url': 'https://example.com/b'}
+        with mock.patch.object(article_cache, 'afetch_article_content', return_value=fetched):
+            self.assertEqual((await article_cache.aget_article_detail('https://example.com/b'))['title'], 'Live')
+        self.assertEqual(self.counted('miss'), 1)
+
+    def test_exported_at_metrics_endpoint(self):
+        metrics.DETAIL_LOOKUPS.inc(outcome='db_hit')
+        response = self.client.get('/metrics')
+        self.assertIn('news_article_detail_lookups_total{process="web",outcome="db_hit"}',
+                      response.content.decode())
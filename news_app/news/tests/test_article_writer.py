@@ -0,0 +1,61 @@
+from datetime import timedelta
+from django.test import TestCase
+from django.utils import timezone
+from news import metrics
+from news.models import NewsArticle
+from news.utils.article_writer import ArticleWriter, FlushResult
+
+
+def article(url, title='Story', **extra):
+    return dict({
+        'url': url, 'title': title, 'summary': 'Summary', 'content': f'<p>{title}</p>', 'source': 'Example',
+        'published_at': timezone.now() - timedelta(hours=1),
+    }, **extra)
+
+
+def written(result):
+    for sample, labels, value in metrics.ARTICLES_WRITTEN.samples():
+        if dict(labels) == {'result': result}:
+            return value
+    return 0
+
+
+class UpsertCountTests(TestCase):
+    def setUp(self):
+        with ArticleWriter() as writer:
+            writer.add(article('https://example.com/a', 'First'))
+            writer.add(article('https://example.com/b', 'Second'))
+
+    def test_existing_urls_are_counted_as_updates(self):
+        before = (written('inserted'), written('updated'))
+        writer = ArticleWriter()
+        writer.add(article('https://example.com/a', 'First, updated'))
+        writer.add(article('https://example.com/b', 'Second, updated', summary='Changed'))
+        writer.add(article('https://example.com/c', 'Third'))
+
+        self.assertEqual(writer.flush(), FlushResult(inserted=1, updated=2))
+        self.assertEqual((writer.inserted, writer.updated), (1, 2))
+        self.assertEqual((written('inserted') - before[0], written('updated') - before[1]), (1, 2))
+
+        self.assertEqual(NewsArticle.objects.count(), 3)
+        updated = NewsArticle.objects.get(url='https://example.com/b')
+        self.assertEqual(updated.title, 'Second, updated')
+        # Columns outside UPDATE_FIELDS keep their stored value
+        self.assertEqual(updated.summary, 'Summary')
+
+    def test_url_repeated_in_a_batch_is_written_once(self):
+        writer = ArticleWriter()
+        writer.add(article('https://example.com/c', 'Draft'))
+        writer.add(article('https://example.com/c', 'Final'))
+        writer.add(article('https://example.com/a', 'First, updated'))
+
+        self.assertEqual(writer.flush(), FlushResult(inserted=1, updated=1))
+        self.assertEqual(NewsArticle.objects.get(url='https://example.com/c').title, 'Final')
+
+    def test_totals_add_up_across_flushes(self):
+        with ArticleWriter(batch_size=2) as writer:
+            for url in ('a', 'c', 'b', 'd', 'e'):
+                writer.add(article(f'https://example.com/{url}'))
+
+        self.assertEqual((writer.inserted, writer.updated), (3, 2))
+        self.assertEqual(NewsArticle.objects.count(), 5)
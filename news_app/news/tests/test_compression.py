@@ -0,0 +1,79 @@
+import zlib
+from io import StringIO
+from unittest import skipIf
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+from news import compression
+from news.compression import RAW, ZLIB, ZSTD, CompressionStats, compress, decompress
+from news.models import NewsArticle
+
+ARTICLE = '<h3>Harbour strike ends</h3>\n' + '<p>Dock workers returned to the cranes on Monday.</p>\n' * 20
+
+
+class CompressTests(SimpleTestCase):
+    def test_zlib_round_trip(self):
+        data = compress(ARTICLE, ZLIB)
+        self.assertEqual(data[0], ZLIB)
+        self.assertLess(len(data), len(ARTICLE))
+        self.assertEqual(decompress(data), ARTICLE)
+
+    @skipIf(compression.zstandard is None, 'zstandard is not installed')
+    def test_zstd_round_trip(self):
+        data = compress(ARTICLE, ZSTD)
+        self.assertEqual(data[0], ZSTD)
+        self.assertEqual(decompress(data), ARTICLE)
+
+    def test_short_text_is_stored_raw(self):
+        for text in ('<p>Short</p>', ''):
+            with self.subTest(text=text):
+                data = compress(text, ZLIB)
+                self.assertEqual(data[0], RAW)
+                self.assertEqual(decompress(data), text)
+
+    def test_non_ascii_text(self):
+        text = '<p>Grève au port : les dockers reprennent le travail, 港口罢工结束。</p>' * 10
+        self.assertEqual(decompress(compress(text)), text)
+
+    def test_unknown_header(self):
+        with self.assertRaises(ValueError):
+            decompress(b'\x09' + zlib.compress(ARTICLE.encode()))
+
+    def test_configured_codec(self):
+        with self.settings(NEWS_CONTENT_CODEC='raw'):
+            self.assertEqual(compress(ARTICLE)[0], RAW)
+        with self.settings(NEWS_CONTENT_CODEC='zlib'):
+            self.assertEqual(compress(ARTICLE)[0], ZLIB)
+
+
+class CompressionStatsTests(SimpleTestCase):
+    def test_totals_per_codec(self):
+        stats = CompressionStats()
+        for data in (compress(ARTICLE, ZLIB), compress(ARTICLE, ZLIB), compress('<p>Short</p>'), None):
+            stats.add(data)
+
+        self.assertEqual(stats.rows, {'zlib': 2, 'raw': 1})
+        self.assertEqual(stats.original_bytes['zlib'], 2 * len(ARTICLE))
+        self.assertEqual(stats.stored_bytes['raw'], len('<p>Short</p>') + 1)
+        self.assertAlmostEqual(stats.ratio, sum(stats.original_bytes.values()) / sum(stats.stored_bytes.values()))
+
+    def test_no_values(self):
+        self.assertIsNone(CompressionStats().ratio)
+
+
+class CompressedTextFieldTests(TestCase):
+    def test_stored_compressed_and_read_as_text(self):
+        NewsArticle.objects.create(title='Strike', url='https://example.com/a', summary='', content=ARTICLE,
+                                   source='Example', published_at=timezone.now())
+
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT content FROM news_newsarticle')
+            stored = bytes(cursor.fetchone()[0])
+        self.assertLess(len(stored), len(ARTICLE))
+        self.assertEqual(NewsArticle.objects.get().content, ARTICLE)
+        self.assertEqual(NewsArticle.objects.values_list('content', flat=True).get(), ARTICLE)
+
+        out = StringIO()
+        call_command('content_stats', stdout=out)
+        self.assertIn('1 rows', out.getvalue())
@@ -0,0 +1,122 @@
+from datetime import timedelta
+from unittest import mock
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+from news.models import NewsArticle
+from news.utils import article_cache, simhash
+from news.utils.article_writer import ArticleWriter
+from news.utils.dedup import title_similarity
+
+WIRE_COPY = (
+    'The central bank raised its main interest rate by a quarter point on Wednesday, the third increase this '
+    'year, saying inflation had stayed higher than expected through the spring. Officials signalled that '
+    'further rises were possible if prices kept climbing, while noting that the labour market had begun to cool.'
+)
+PAYWALL = (
+    'Subscribe to keep reading. You have reached your limit of free articles this month. Already a subscriber? '
+    'Log in to continue reading and get unlimited access to our award winning journalism on any device.'
+)
+
+
+def article(url, title, content, **extra):
+    return dict({
+        'url': url, 'title': title, 'summary': '', 'content': f'<p>{content}</p>', 'source': url.split('/')[2],
+        'published_at': timezone.now() - timedelta(hours=1), 'simhash': simhash.fingerprint(content),
+    }, **extra)
+
+
+class SimHashTests(SimpleTestCase):
+    def test_near_identical_texts_are_close(self):
+        edited = WIRE_COPY.replace('Wednesday', 'Wednesday afternoon')
+        self.assertEqual(simhash.fingerprint(WIRE_COPY), simhash.fingerprint(f'<p>{WIRE_COPY}</p>'))
+        self.assertLessEqual(simhash.distance(simhash.fingerprint(WIRE_COPY), simhash.fingerprint(edited)), 3)
+        self.assertGreater(simhash.distance(simhash.fingerprint(WIRE_COPY), simhash.fingerprint(PAYWALL)), 3)
+
+    def test_short_texts_have_no_fingerprint(self):
+        self.assertIsNone(simhash.fingerprint('Too short to compare'))
+
+    def test_signed_storage_round_trip(self):
+        for value in (0, 1, (1 << 63) - 1, 1 << 63, (1 << 64) - 1):
+            with self.subTest(value=value):
+                self.assertEqual(simhash.to_unsigned(simhash.to_signed(value)), value)
+                self.assertGreaterEqual(simhash.to_signed(value), -(1 << 63))
+
+    def test_bands_split_the_fingerprint(self):
+        value = 0x1111_2222_3333_4444
+        self.assertEqual(simhash.bands(value), (0x4444, 0x3333, 0x2222, 0x1111))
+
+    def test_band_index_finds_nearest_within_distance(self):
+        index = simhash.BandIndex()
+        index.add(0b1111, 'far')
+        index.add(0b0001, 'near')
+        self.assertEqual(index.nearest(0b0000, 3), 'near')
+        self.assertEqual(index.nearest(0b0000, 3, accept=lambda item: item != 'near'), None)
+        # Differs in every band, so it is never even compared
+        self.assertIsNone(simhash.BandIndex().nearest(0, 64))
+
+    def test_title_similarity(self):
+        self.assertEqual(title_similarity('Central bank raises rates', 'Central Bank raises rates'), 1.0)
+        self.assertGreaterEqual(title_similarity('Central bank raises rates again',
+                                                 'Central bank raises rates - Wire'), 0.5)
+        self.assertLess(title_similarity('Harbour strike ends', 'Central bank raises rates'), 0.5)
+        self.assertEqual(title_similarity('', 'Central bank raises rates'), 0.0)
+
+
+class StoryClusteringTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_repeated_story_is_linked_without_content(self):
+        with ArticleWriter() as writer:
+            writer.add(article('https://a.example/rates', 'Central bank raises rates', WIRE_COPY))
+        with ArticleWriter() as writer:
+            writer.add(article('https://b.example/rates', 'Central bank raises rates again', WIRE_COPY))
+
+        original = NewsArticle.objects.get(url='https://a.example/rates')
+        duplicate = NewsArticle.objects.get(url='https://b.example/rates')
+        self.assertEqual(duplicate.duplicate_of, original)
+        self.assertEqual(duplicate.content, '')
+        self.assertEqual(writer.duplicates, 1)
+
+    def test_duplicates_within_a_batch(self):
+        with ArticleWriter() as writer:
+            writer.add(article('https://a.example/rates', 'Central bank raises rates', WIRE_COPY))
+            writer.add(article('https://b.example/rates', 'Central bank raises rates', WIRE_COPY))
+
+        self.assertEqual(NewsArticle.objects.get(url='https://b.example/rates').duplicate_of.url,
+                         'https://a.example/rates')
+
+    def test_shared_boilerplate_does_not_merge_different_stories(self):
+        with ArticleWriter() as writer:
+            writer.add(article('https://a.example/rates', 'Central bank raises rates', PAYWALL))
+            writer.add(article('https://a.example/strike', 'Harbour strike ends', PAYWALL))
+
+        self.assertFalse(NewsArticle.objects.filter(duplicate_of__isnull=False).exists())
+
+    def test_deleted_representative_hands_its_content_over(self):
+        with ArticleWriter() as writer:
+            writer.add(article('https://a.example/rates', 'Central bank raises rates', WIRE_COPY))
+            writer.add(article('https://b.example/rates', 'Central bank raises rates', WIRE_COPY))
+            writer.add(article('https://c.example/rates', 'Central bank raises rates', WIRE_COPY))
+
+        NewsArticle.objects.filter(url='https://a.example/rates').delete()
+        successor = NewsArticle.objects.get(url='https://b.example/rates')
+        self.assertIsNone(successor.duplicate_of)
+        self.assertEqual(successor.content, f'<p>{WIRE_COPY}</p>')
+        self.assertEqual(NewsArticle.objects.get(url='https://c.example/rates').duplicate_of, successor)
+
+    async def test_duplicate_detail_shows_the_story_content(self):
+        def write():
+            with ArticleWriter() as writer:
+                writer.add(article('https://a.example/rates', 'Central bank raises rates', WIRE_COPY))
+                writer.add(article('https://b.example/rates', 'Central bank raises rates', WIRE_COPY))
+        await sync_to_async(write)()
+
+        with mock.patch.object(article_cache, 'afetch_article_content') as fetch:
+            detail = await article_cache.aget_article_detail('https://b.example/rates')
+        fetch.assert_not_called()
+        self.assertEqual(detail['content'], f'<p>{WIRE_COPY}</p>')
+        self.assertEqual(detail['url'], 'https://b.example/rates')
+        self.assertEqual((await NewsArticle.objects.aget(url='https://b.example/rates')).content, '')
@@ -0,0 +1,85 @@
+from datetime import timedelta
+from django.test import TestCase
+from django.utils import timezone
+from news import facets
+from news.models import ArticleFacet, NewsArticle, NewsSource
+from news.utils import simhash
+from news.utils.article_writer import ArticleWriter
+
+WIRE_COPY = (
+    'The harbour authority approved the new container terminal on Tuesday after a year of hearings, '
+    'saying the expansion would double capacity by the end of the decade while dredging works begin in spring.'
+)
+
+
+class FacetCountTests(TestCase):
+    def setUp(self):
+        self.source = NewsSource.objects.create(name='Example')
+        self.published_at = timezone.now() - timedelta(hours=1)
+
+    def article(self, url, category='Business', content=None, **extra):
+        return dict({
+            'url': url, 'title': url, 'summary': '', 'content': f'<p>{content or url}</p>', 'source': 'Example',
+            'category': category, 'news_source_id': self.source.id, 'published_at': self.published_at,
+            'simhash': simhash.fingerprint(content) if content else None,
+        }, **extra)
+
+    def write(self, *articles):
+        with ArticleWriter() as writer:
+            writer.extend(articles)
+
+    def counts(self):
+        return dict(((kind, value), count) for kind, value, count in
+                    ArticleFacet.objects.filter(article_count__gt=0).values_list('kind', 'value', 'article_count'))
+
+    def assert_counts(self, total, business=0, sport=0):
+        expected = {(ArticleFacet.TOTAL, ''): total, (ArticleFacet.SOURCE, str(self.source.id)): total,
+                    (ArticleFacet.CATEGORY, 'Business'): business, (ArticleFacet.CATEGORY, 'Sport'): sport}
+        expected = {key: count for key, count in expected.items() if count}
+        self.assertEqual(self.counts(), expected)
+        # The running counts agree with a recount from scratch
+        facets.rebuild()
+        self.assertEqual(self.counts(), expected)
+
+    def test_insert_counts_up(self):
+        self.write(self.article('https://a.example/1'), self.article('https://a.example/2', 'Sport'))
+        self.assert_counts(total=2, business=1, sport=1)
+
+        self.write(self.article('https://a.example/3'))
+        self.assert_counts(total=3, business=2, sport=1)
+
+    def test_upsert_does_not_count_again(self):
+        self.write(self.article('https://a.example/1'), self.article('https://a.example/2'))
+        self.write(self.article('https://a.example/1', title='Updated'))
+        self.assert_counts(total=2, business=2)
+
+        # An update moves the article between categories without changing the total
+        self.write(self.article('https://a.example/2', 'Sport'))
+        self.assert_counts(total=2, business=1, sport=1)
+
+    def test_delete_counts_down(self):
+        self.write(self.article('https://a.example/1'), self.article('https://a.example/2', 'Sport'))
+        newest = NewsArticle.objects.get(url='https://a.example/2')
+        older = self.published_at - timedelta(days=1)
+        NewsArticle.objects.filter(url='https://a.example/1').update(published_at=older)
+
+        newest.delete()
+        self.assert_counts(total=1, business=1)
+        total = ArticleFacet.objects.get(kind=ArticleFacet.TOTAL)
+        self.assertEqual(total.latest_published_at, older)
+
+    def test_duplicates_are_not_counted(self):
+        title = 'Harbour terminal approved'
+        self.write(self.article('https://a.example/1', content=WIRE_COPY, title=title),
+                   self.article('https://b.example/1', content=WIRE_COPY, title=title))
+        self.write(self.article('https://c.example/1', content=WIRE_COPY, title=title))
+        self.assertEqual(NewsArticle.objects.filter(duplicate_of__isnull=False).count(), 2)
+        self.assert_counts(total=1, business=1)
+
+        # Deleting a duplicate leaves the story counted; deleting the story hands it to a duplicate
+        NewsArticle.objects.get(url='https://c.example/1').delete()
+        self.assert_counts(total=1, business=1)
+        NewsArticle.objects.get(url='https://a.example/1').delete()
+        self.assert_counts(total=1, business=1)
+        NewsArticle.objects.get(url='https://b.example/1').delete()
+        self.assert_counts(total=0)
@@ -0,0 +1,81 @@
+from unittest import mock
+import requests
+from django.test import SimpleTestCase, TestCase
+from news.models import NewsSource, RSSLink
+from news.utils import article_fetcher, feed_parser
+from news.utils.article_fetcher import FeedFetchResult
+from news.utils.feed_parser import FeedParser
+
+FEED = 'https://a.example/feed'
+
+
+def response(status_code):
+    download = mock.MagicMock(status_code=status_code, ok=status_code < 400, headers={})
+    download.__enter__.return_value = download
+    return download
+
+
+def rss(*links):
+    items = ''.join(
+        f'<item><title>Story</title><link>{link}</link><pubDate>Mon, 12 Oct 2026 08:00:00 +0000</pubDate></item>'
+        for link in links
+    )
+    return f'<?xml version="1.0"?><rss><channel>{items}</channel></rss>'.encode()
+
+
+class ConditionalGetTests(SimpleTestCase):
+    def test_not_modified_feed_is_not_parsed(self):
+        with mock.patch.object(article_fetcher.http_client, 'open_download', return_value=response(304)) as get, \
+                mock.patch.object(article_fetcher, '_process_response') as process:
+            result = article_fetcher.fetch_feed(FEED, '"v1"', 'Mon, 12 Oct 2026 08:00:00 GMT')
+
+        headers = get.call_args.args[1]
+        self.assertEqual(headers['If-None-Match'], '"v1"')
+        self.assertEqual(headers['If-Modified-Since'], 'Mon, 12 Oct 2026 08:00:00 GMT')
+        process.assert_not_called()
+        self.assertTrue(result.not_modified)
+        self.assertIsNone(result.articles)
+        self.assertEqual((result.etag, result.last_modified), ('"v1"', 'Mon, 12 Oct 2026 08:00:00 GMT'))
+
+    def test_first_fetch_is_unconditional(self):
+        with mock.patch.object(article_fetcher.http_client, 'open_download', return_value=response(304)) as get:
+            article_fetcher.fetch_feed(FEED)
+        self.assertEqual(get.call_args.args[1], {})
+
+
+class FailedItemTests(SimpleTestCase):
+    def failed_links(self, **download):
+        failed = []
+        with mock.patch.object(article_fetcher.http_client, 'open_download', **download), \
+                self.assertLogs(article_fetcher.logger, 'WARNING'):
+            articles = article_fetcher._process_rss_feed(rss('https://news.example/a'), FEED, failed_links=failed)
+        self.assertIsNone(articles)
+        return failed
+
+    def test_download_errors_are_retried(self):
+        self.assertEqual(self.failed_links(return_value=response(503)), ['https://news.example/a'])
+        self.assertEqual(self.failed_links(side_effect=requests.ConnectionError('reset')), ['https://news.example/a'])
+
+    def test_missing_pages_are_not(self):
+        self.assertEqual(self.failed_links(return_value=response(404)), [])
+
+
+class SaveValidatorsTests(TestCase):
+    def setUp(self):
+        source = NewsSource.objects.create(name='Example')
+        self.link = RSSLink.objects.create(source=source, url=FEED, etag='"v1"', last_modified='old')
+
+    def fetch(self, result):
+        with mock.patch.object(feed_parser, 'fetch_feed', return_value=result):
+            FeedParser(extract_workers=0, force=True).fetch_feeds([self.link])
+        self.link.refresh_from_db()
+
+    def test_saved_when_every_item_was_processed(self):
+        self.fetch(FeedFetchResult(articles=[], etag='"v2"', last_modified='new'))
+        self.assertEqual((self.link.etag, self.link.last_modified), ('"v2"', 'new'))
+        self.assertIsNotNone(self.link.last_fetched)
+
+    def test_kept_after_failed_items(self):
+        self.fetch(FeedFetchResult(articles=[], etag='"v2"', last_modified='new', complete=False))
+        self.assertEqual((self.link.etag, self.link.last_modified), ('"v1"', 'old'))
+        self.assertIsNotNone(self.link.last_fetched)
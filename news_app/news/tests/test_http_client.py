@@ -0,0 +1,102 @@
+import asyncio
+import io
+from unittest import mock, skipIf
+import requests
+from django.test import SimpleTestCase
+from news import metrics
+from news.utils import http_client
+from news.utils.http_client import sniff_content
+
+
+class SniffContentTests(SimpleTestCase):
+    def test_feeds(self):
+        for body in (
+            b'<?xml version="1.0" encoding="utf-8"?>\n<rss version="2.0"><channel></channel></rss>',
+            b'\xef\xbb\xbf<?xml version="1.0"?><!-- generator --><feed xmlns="http://www.w3.org/2005/Atom">',
+            b'<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#">',
+            # Unknown root, but an XML declaration
+            b'<?xml version="1.0"?><urlset>',
+        ):
+            with self.subTest(body=body):
+                self.assertEqual(sniff_content(body), 'feed')
+
+    def test_html_quoted_inside_a_feed_is_ignored(self):
+        body = (b'<?xml version="1.0"?><rss><channel><item><description><![CDATA[<html><head></head>'
+                b'<body><header>Breaking</header></body></html>]]></description></item></channel></rss>')
+        self.assertEqual(sniff_content(body, 'text/html'), 'feed')
+
+    def test_html_pages(self):
+        for body in (
+            b'\n  <!DOCTYPE html>\n<html lang="en"><head><title>Story</title>',
+            b'\xef\xbb\xbf<!-- cached --><html>',
+            b'<?xml version="1.0" encoding="utf-8"?>\n<!DOCTYPE html PUBLIC "-//W3C//DTD XHTML 1.0 Strict//EN" '
+            b'"http://www.w3.org/TR/xhtml1/DTD/xhtml1-strict.dtd">\n<html xmlns="http://www.w3.org/1999/xhtml">',
+            b'<body><p>A fragment</p></body>',
+        ):
+            with self.subTest(body=body):
+                self.assertEqual(sniff_content(body), 'html')
+
+    def test_markup_later_in_the_body_does_not_count(self):
+        self.assertIsNone(sniff_content(b'Plain text that mentions <rss> and <html> tags'))
+
+    def test_falls_back_to_headers(self):
+        self.assertEqual(sniff_content(b'<div>Story</div>', 'text/html; charset=utf-8'), 'html')
+        self.assertEqual(sniff_content(b'<channel>', 'application/xml'), 'feed')
+        self.assertEqual(sniff_content(b'<channel>', '', 'https://example.com/news.rss'), 'feed')
+
+    def test_binary_bodies(self):
+        for body in (b'%PDF-1.7\n', b'\x89PNG\r\n\x1a\n', b'\x00\x00\x00\x18ftypmp42'):
+            with self.subTest(body=body):
+                self.assertIsNone(sniff_content(body, 'text/html'))
+
+
+class HostLabelTests(SimpleTestCase):
+    def setUp(self):
+        patcher = mock.patch.object(metrics, '_feed_sites', set())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def host_samples(self, url):
+        response = requests.Response()
+        response.status_code, response.url, response.raw = 200, url, io.BytesIO(b'')
+        http_client.Download(response, max_bytes=1024, stage='host_label_test').close()
+        return {dict(labels)['host'] for sample, labels, value in metrics.HOST_DURATION.samples()
+                if dict(labels)['stage'] == 'host_label_test'}
+
+    def test_only_feed_sites_get_their_own_series(self):
+        metrics.track_feed_sites(['https://feeds.example.com/rss.xml'])
+
+        self.assertEqual(metrics.host_label('https://www.example.com/story'), 'example.com')
+        self.assertEqual(metrics.host_label('https://EXAMPLE.com:443/story'), 'example.com')
+        self.assertEqual(metrics.host_label('https://cdn.example.com/story'), metrics.OTHER_HOST)
+        self.assertEqual(metrics.host_label('https://elsewhere.example/story'), metrics.OTHER_HOST)
+
+    def test_downloads_from_other_hosts_share_one_series(self):
+        metrics.track_feed_sites(['https://example.com/feed'])
+        for i in range(5):
+            self.host_samples(f'https://site{i}.example/story')
+        self.host_samples('https://www.example.com/story')
+
+        self.assertEqual(self.host_samples('https://example.com/feed'), {'example.com', metrics.OTHER_HOST})
+
+
+@skipIf(http_client.httpx is None, 'httpx is not installed')
+class AsyncClientTests(SimpleTestCase):
+    def tearDown(self):
+        http_client.close_async_client()
+
+    def test_one_client_serves_every_event_loop(self):
+        async def client():
+            return http_client.get_async_client()
+
+        # Each call runs on a new event loop, like async views under WSGI
+        first, second = asyncio.run(client()), asyncio.run(client())
+        self.assertIs(first[0], second[0])
+        self.assertIs(first[1], second[1])
+
+    def test_closed_at_shutdown(self):
+        client, loop = http_client.get_async_client()
+        http_client.close_async_client()
+
+        self.assertTrue(client.is_closed)
+        self.assertIsNot(http_client.get_async_client()[0], client)
@@ -0,0 +1,61 @@
+from unittest import mock
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+from news.models import NewsArticle, NewsSource, RSSLink, URLAlias
+from news.utils import article_fetcher
+from news.utils.known_urls import KnownURLs
+
+FEED_A = 'https://a.example/feed'
+FEED_B = 'https://b.example/feed'
+
+
+def rss(*links):
+    items = ''.join(
+        f'<item><title>Story</title><link>{link}</link><pubDate>Mon, 12 Oct 2026 08:00:00 +0000</pubDate></item>'
+        for link in links
+    )
+    return f'<?xml version="1.0"?><rss><channel>{items}</channel></rss>'.encode()
+
+
+class EarlyStopTests(SimpleTestCase):
+    def fetched_links(self, content, known_urls):
+        with mock.patch.object(article_fetcher, '_fetch_rss_item', return_value={'title': 'Story'}) as fetch:
+            article_fetcher._process_rss_feed(content, FEED_A, known_urls=known_urls)
+        return [call.args[1] for call in fetch.call_args_list]
+
+    def test_stops_at_item_this_feed_stored(self):
+        known_urls = KnownURLs([('https://news.example/old', FEED_A)])
+        content = rss('https://news.example/new', 'https://news.example/old', 'https://news.example/older')
+
+        self.assertEqual(self.fetched_links(content, known_urls), ['https://news.example/new'])
+
+    def test_skips_past_item_another_feed_stored(self):
+        # Another feed's story at the top says nothing about the items below it
+        known_urls = KnownURLs([('https://news.example/shared', FEED_B), ('https://news.example/no-feed', None)])
+        content = rss('https://news.example/shared', 'https://news.example/new', 'https://news.example/no-feed',
+                      'https://news.example/newer-than-last-run')
+
+        self.assertEqual(self.fetched_links(content, known_urls),
+                         ['https://news.example/new', 'https://news.example/newer-than-last-run'])
+
+    def test_stored_during_run_counts_for_its_feed(self):
+        known_urls = KnownURLs()
+        known_urls.mark_stored(['https://news.example/a'], feed_url=FEED_A)
+
+        self.assertTrue(known_urls.is_stored('https://news.example/a?utm_source=rss', feed_url=FEED_A))
+        self.assertFalse(known_urls.is_stored('https://news.example/a', feed_url=FEED_B))
+        self.assertIn('https://news.example/a', known_urls)
+
+
+class KnownURLsFromDatabaseTests(TestCase):
+    def test_articles_and_aliases_keep_their_feed(self):
+        source = NewsSource.objects.create(name='Example')
+        link = RSSLink.objects.create(source=source, url=FEED_A)
+        NewsArticle.objects.create(title='Story', url='https://news.example/a', summary='', content='',
+                                   source='Example', published_at=timezone.now(), rss_link=link)
+        URLAlias.objects.create(alias='https://mirror.example/a', canonical_url='https://news.example/a')
+
+        known_urls = KnownURLs.from_database()
+        self.assertTrue(known_urls.is_stored('https://news.example/a', feed_url=FEED_A))
+        self.assertTrue(known_urls.is_stored('https://mirror.example/a', feed_url=FEED_A))
+        self.assertFalse(known_urls.is_stored('https://mirror.example/a', feed_url=FEED_B))
@@ -0,0 +1,48 @@
+from datetime import timedelta
+from unittest import mock
+from django.test import TestCase
+from django.utils import timezone
+from news import leases
+from news.models import Lease
+from news.utils.scheduler import LOCK_NAME, FeedScheduler, SchedulerLocked
+
+
+class LeaseTests(TestCase):
+    def test_only_one_holder(self):
+        self.assertTrue(leases.acquire('job', 'a', 60))
+        self.assertFalse(leases.acquire('job', 'b', 60))
+        # Re-acquiring your own lease extends it
+        self.assertTrue(leases.acquire('job', 'a', 60))
+
+    def test_expired_lease_is_taken_over(self):
+        self.assertTrue(leases.acquire('job', 'a', 60))
+        Lease.objects.filter(name='job').update(expires_at=timezone.now() - timedelta(seconds=1))
+
+        self.assertTrue(leases.acquire('job', 'b', 60))
+        self.assertFalse(leases.renew('job', 'a', 60))
+        self.assertTrue(leases.renew('job', 'b', 60))
+
+    def test_release_only_by_holder(self):
+        leases.acquire('job', 'a', 60)
+        leases.release('job', 'b')
+        self.assertFalse(leases.acquire('job', 'b', 60))
+        leases.release('job', 'a')
+        self.assertTrue(leases.acquire('job', 'b', 60))
+
+
+class SchedulerLockTests(TestCase):
+    def test_second_scheduler_is_refused(self):
+        leases.acquire(LOCK_NAME, 'other-process', 600)
+        scheduler = FeedScheduler(parser=mock.Mock())
+
+        with self.assertRaises(SchedulerLocked):
+            scheduler.run(once=True)
+        scheduler.parser.build_extractor.assert_not_called()
+
+    def test_lock_released_after_run(self):
+        parser = mock.Mock(force=False)
+        scheduler = FeedScheduler(parser=parser)
+        with mock.patch.object(scheduler, 'run_due', return_value=0):
+            scheduler.run(once=True)
+
+        self.assertFalse(Lease.objects.filter(name=LOCK_NAME).exists())
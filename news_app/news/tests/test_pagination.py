@@ -0,0 +1,80 @@
+import base64
+import json
+import re
+from datetime import timedelta
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+from news import pagination
+from news.models import NewsArticle
+
+
+def raw_cursor(value):
+    return base64.urlsafe_b64encode(json.dumps(value).encode('utf-8')).decode('ascii')
+
+
+TAMPERED_CURSORS = [
+    '!!!', 'é', 'bm90IGpzb24',
+    raw_cursor(42), raw_cursor([]), raw_cursor(['2026-10-12T08:00:00+00:00']),
+    raw_cursor([None, 1]), raw_cursor(['yesterday', 1]), raw_cursor(['2026-10-12T08:00:00+00:00', 'x']),
+    raw_cursor(['2026-10-12T08:00:00', 1]), raw_cursor(['2026-10-12T08:00:00+00:00', 10 ** 30]),
+    raw_cursor({'page': 2}), raw_cursor({'offset': None}),
+]
+
+
+class DecodeCursorTests(SimpleTestCase):
+    def test_round_trip(self):
+        article = NewsArticle(id=7, published_at=timezone.now())
+        self.assertEqual(pagination.decode_cursor(pagination.encode_cursor(article)), (article.published_at, 7))
+        self.assertEqual(pagination.decode_cursor(pagination.encode_offset_cursor(40)), {'offset': 40})
+
+    def test_tampered_cursor_is_ignored(self):
+        for cursor in TAMPERED_CURSORS:
+            with self.subTest(cursor=cursor):
+                self.assertIsNone(pagination.decode_cursor(cursor))
+        self.assertEqual(pagination.decode_cursor(raw_cursor({'offset': -5})), {'offset': 0})
+
+
+class KeysetPageTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        published_at = timezone.now() - timedelta(hours=1)
+        # Most articles share a publication time, so only the id tells them apart
+        NewsArticle.objects.bulk_create([
+            NewsArticle(title=f'Story {i}', url=f'https://example.com/{i}', summary='', content='',
+                        source='Example', published_at=published_at - timedelta(minutes=i // 10 * 10))
+            for i in range(25)
+        ])
+
+    async def pages(self, limit):
+        cursor, pages = None, []
+        while True:
+            articles, cursor = await pagination.akeyset_page(NewsArticle.objects.all(), cursor, limit)
+            pages.append([article.id for article in articles])
+            if cursor is None:
+                return pages
+
+    async def test_equal_publication_times_are_not_skipped_or_repeated(self):
+        expected = [article.id async for article in NewsArticle.objects.order_by(*pagination.ORDERING)]
+        for limit in (1, 3, 7, 10, 25, 30):
+            with self.subTest(limit=limit):
+                pages = await self.pages(limit)
+                self.assertEqual([article_id for page in pages for article_id in page], expected)
+                self.assertTrue(all(len(page) == limit for page in pages[:-1]))
+
+    async def test_tampered_cursor_starts_over(self):
+        first_page, _ = await pagination.akeyset_page(NewsArticle.objects.all(), None, 10)
+        for cursor in TAMPERED_CURSORS:
+            with self.subTest(cursor=cursor):
+                articles, next_cursor = await pagination.akeyset_page(NewsArticle.objects.all(), cursor, 10)
+                self.assertEqual(articles, first_page)
+                self.assertIsNotNone(next_cursor)
+
+    def test_listing_endpoint_ignores_tampered_cursor(self):
+        for cursor in ('!!!', raw_cursor(['2026-10-12T08:00:00+00:00', 'x'])):
+            with self.subTest(cursor=cursor):
+                response = self.client.get('/', {'cursor': cursor}, HTTP_HX_REQUEST='true')
+                self.assertEqual(response.status_code, 200)
+                data = response.json()
+                self.assertTrue(data['has_more'])
+                self.assertEqual(len(re.findall('class="article"', data['html'])), 20)
@@ -0,0 +1,94 @@
+from datetime import timedelta
+from django.test import SimpleTestCase, override_settings
+from django.utils import timezone
+from news.models import RSSLink
+from news.utils.article_fetcher import FeedFetchResult
+from news.utils.scheduler import FeedScheduler
+
+FAILED = object()
+
+
+@override_settings(NEWS_SCHEDULER_MIN_INTERVAL=300, NEWS_SCHEDULER_MAX_INTERVAL=86400,
+                   NEWS_SCHEDULER_TARGET_ITEMS=1, NEWS_SCHEDULER_SMOOTHING=0.3)
+class NextFetchAtTests(SimpleTestCase):
+    def setUp(self):
+        self.scheduler = FeedScheduler(parser=object(), interval=1800, jitter=0)
+        self.now = timezone.now()
+
+    def link(self, **fields):
+        fields.setdefault('last_fetched', self.now - timedelta(hours=1))
+        return RSSLink(url='https://a.example/feed', **fields)
+
+    def poll(self, link, new_items=0, after=timedelta(hours=1)):
+        """Poll the link `after` its last fetch and return the interval it was given."""
+        self.now = link.last_fetched + after
+        if new_items is FAILED:
+            result = None
+        else:
+            result = FeedFetchResult(articles=[{'title': 'Story'}] * new_items)
+        next_fetch_at = self.scheduler.next_fetch_at(link, result, self.now)
+        # poll_interval is stored in whole seconds
+        self.assertAlmostEqual(next_fetch_at, self.now + timedelta(seconds=link.poll_interval),
+                               delta=timedelta(seconds=1))
+        link.last_fetched = self.now
+        return link.poll_interval
+
+    def test_interval_shrinks_as_items_arrive(self):
+        # A quiet feed, polled every two hours, starts publishing several items an hour
+        link = self.link(poll_interval=7200, arrival_rate=0.5, hit_ratio=0.5)
+        intervals = [self.poll(link, new_items=4) for _ in range(3)]
+
+        self.assertLess(intervals[0], 7200)
+        self.assertEqual(intervals, sorted(intervals, reverse=True))
+        self.assertGreater(link.arrival_rate, 0.5)
+        self.assertGreater(link.hit_ratio, 0.5)
+
+    def test_empty_polls_back_off(self):
+        link = self.link(poll_interval=1800, arrival_rate=2.0, hit_ratio=1.0)
+        intervals = [self.poll(link, after=timedelta(seconds=link.poll_interval)) for _ in range(4)]
+
+        self.assertGreater(intervals[0], 1800)
+        self.assertEqual(intervals, sorted(intervals))
+        self.assertEqual(link.consecutive_failures, 0)
+
+    def test_failures_back_off_and_count(self):
+        link = self.link(poll_interval=1800, arrival_rate=2.0, hit_ratio=1.0)
+
+        self.assertEqual(self.poll(link, FAILED), 3600)
+        self.assertEqual(self.poll(link, FAILED), 7200)
+        self.assertEqual(link.consecutive_failures, 2)
+        # A failure says nothing about how often the feed publishes
+        self.assertEqual((link.arrival_rate, link.hit_ratio), (2.0, 1.0))
+
+        # A feed that fails to parse is a failure, one that is not modified is not
+        self.scheduler.next_fetch_at(link, FeedFetchResult(), self.now)
+        self.assertEqual(link.consecutive_failures, 3)
+        self.scheduler.next_fetch_at(link, FeedFetchResult(not_modified=True), self.now)
+        self.assertEqual(link.consecutive_failures, 0)
+
+    def test_interval_is_clamped(self):
+        failing = self.link(poll_interval=1800)
+        for _ in range(10):
+            self.poll(failing, FAILED)
+        self.assertEqual(failing.poll_interval, 86400)
+
+        busy = self.link(poll_interval=1800)
+        for _ in range(3):
+            self.poll(busy, new_items=50, after=timedelta(minutes=5))
+        self.assertEqual(busy.poll_interval, 300)
+
+    def test_first_poll_backlog_does_not_set_the_rate(self):
+        link = self.link(last_fetched=None)
+        self.now = timezone.now()
+        self.scheduler.next_fetch_at(link, FeedFetchResult(articles=[{'title': 'Story'}] * 30), self.now)
+
+        self.assertEqual(link.arrival_rate, 0)
+        self.assertEqual(link.poll_interval, int(1800 * (1.5 - 0.3)))
+
+    def test_jitter_spreads_polls(self):
+        self.scheduler.jitter = 0.1
+        link = self.link(poll_interval=3600, arrival_rate=1.0, hit_ratio=0.5)
+        next_fetch_at = self.scheduler.next_fetch_at(link, FeedFetchResult(articles=[]), self.now)
+
+        spread = timedelta(seconds=link.poll_interval * 0.1 + 1)
+        self.assertLessEqual(abs(next_fetch_at - (self.now + timedelta(seconds=link.poll_interval))), spread)
@@ -0,0 +1,76 @@
+from datetime import timedelta
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+from news import search
+from news.models import NewsArticle, NewsSource
+from news.utils import article_cache
+from news.utils.article_writer import ArticleWriter
+
+
+def article(url, title, content, **extra):
+    return dict({
+        'url': url, 'title': title, 'summary': '', 'content': content, 'source': 'Example',
+        'published_at': timezone.now() - timedelta(hours=1),
+    }, **extra)
+
+
+class FullTextIndexTests(TestCase):
+    def test_index_is_contentless(self):
+        self.assertTrue(search.is_available())
+        self.assertNotIn(f'{search.FTS_TABLE}_content', connection.introspection.table_names())
+
+    def test_written_articles_are_found(self):
+        with ArticleWriter() as writer:
+            writer.add(article('https://example.com/a', 'Harbour strike ends', '<p>Dockers return to work.</p>'))
+            writer.add(article('https://example.com/b', 'Budget vote', '<p>Parliament passes the budget.</p>'))
+        ids = dict(NewsArticle.objects.values_list('url', 'id'))
+
+        self.assertEqual(search.search_article_ids('dockers'), [ids['https://example.com/a']])
+        self.assertEqual(search.search_article_ids('parliament budg'), [ids['https://example.com/b']])
+
+    def test_replaced_article_drops_its_old_terms(self):
+        with ArticleWriter() as writer:
+            writer.add(article('https://example.com/a', 'Harbour strike', '<p>Dockers walk out.</p>'))
+        with ArticleWriter() as writer:
+            writer.add(article('https://example.com/a', 'Harbour strike ends', '<p>Cranes move again.</p>'))
+        article_id = NewsArticle.objects.get().id
+
+        self.assertEqual(search.search_article_ids('dockers'), [])
+        self.assertEqual(search.search_article_ids('cranes'), [article_id])
+        self.assertEqual(search.search_article_ids('harbour'), [article_id])
+
+    def test_live_fetched_content_is_indexed(self):
+        with ArticleWriter() as writer:
+            writer.add(article('https://example.com/a', 'Harbour strike', ''))
+        article_cache._store_content('https://example.com/a', '<p>Dockers walk out.</p>')
+
+        self.assertEqual(search.search_article_ids('dockers'), [NewsArticle.objects.get().id])
+
+
+class FilteredSearchTests(TestCase):
+    def setUp(self):
+        self.a = NewsSource.objects.create(name='A')
+        self.b = NewsSource.objects.create(name='B')
+        with ArticleWriter() as writer:
+            for i in range(8):
+                writer.add(article(f'https://a.example/{i}', f'Harbour news {i}', '<p>Harbour.</p>',
+                                   news_source_id=self.a.id))
+            for i in range(3):
+                writer.add(article(f'https://b.example/{i}', f'Harbour report {i}', '<p>Quay.</p>',
+                                   news_source_id=self.b.id))
+
+    def test_filters_apply_before_the_result_limit(self):
+        with self.settings(NEWS_SEARCH_MAX_RESULTS=5):
+            response = self.client.get('/', {'search': 'harbour', 'source': 'B'})
+
+        self.assertEqual(response.context['total_count'], 3)
+        self.assertEqual({a.url for a in response.context['news_articles']},
+                         {f'https://b.example/{i}' for i in range(3)})
+
+    def test_total_counts_every_match(self):
+        with self.settings(NEWS_SEARCH_MAX_RESULTS=5):
+            response = self.client.get('/', {'search': 'harbour'})
+
+        self.assertEqual(response.context['total_count'], 11)
+        self.assertEqual(search.count_matches('harbour', within=NewsArticle.objects.filter(news_source=self.a)), 8)
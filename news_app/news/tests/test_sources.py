@@ -0,0 +1,26 @@
+from django.test import TestCase
+from django.utils import timezone
+from news.models import NewsArticle, NewsSource, RSSLink
+
+
+class UpdateSourceTests(TestCase):
+    def test_unchanged_links_keep_their_rows(self):
+        source = NewsSource.objects.create(name='Example')
+        kept = RSSLink.objects.create(source=source, url='https://example.com/world.rss', etag='"v1"',
+                                      last_modified='Mon, 12 Oct 2026 08:00:00 GMT', poll_interval=600)
+        RSSLink.objects.create(source=source, url='https://example.com/old.rss')
+        article = NewsArticle.objects.create(title='Story', url='https://example.com/a', summary='', content='',
+                                             source='Example', published_at=timezone.now(), rss_link=kept)
+
+        response = self.client.post(f'/news/sources/{source.id}/update/', {
+            'name': 'Example News',
+            'links[]': ['https://example.com/world.rss', 'https://example.com/sport.rss', ' '],
+        })
+
+        self.assertEqual(response.json(), {'success': True})
+        self.assertEqual(set(source.links.values_list('url', flat=True)),
+                         {'https://example.com/world.rss', 'https://example.com/sport.rss'})
+        kept.refresh_from_db()
+        self.assertEqual((kept.etag, kept.poll_interval), ('"v1"', 600))
+        article.refresh_from_db()
+        self.assertEqual(article.rss_link_id, kept.id)
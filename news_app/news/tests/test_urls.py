@@ -0,0 +1,98 @@
+from datetime import timedelta
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+from news.models import NewsArticle, URLAlias
+from news.utils.article_writer import ArticleWriter
+from news.utils.urls import canonicalize_url, resolve_canonical, url_key
+
+
+class CanonicalizeURLTests(SimpleTestCase):
+    def test_drops_tracking_parameters_fragment_and_default_port(self):
+        self.assertEqual(
+            canonicalize_url('HTTPS://News.Example:443/story?utm_source=rss&id=7&fbclid=abc&UTM_Medium=x#top'),
+            'https://news.example/story?id=7'
+        )
+        self.assertEqual(canonicalize_url('http://news.example:8080'), 'http://news.example:8080/')
+
+    def test_keeps_the_query_as_sent(self):
+        for url in (
+            'https://news.example/story?flag',
+            'https://news.example/story?x=1;y=2',
+            'https://news.example/search?q=harbour%20strike',
+            'https://news.example/search?q=a+b&page=2&lang=en',
+            'https://news.example/story?b=2&a=1',
+        ):
+            with self.subTest(url=url):
+                self.assertEqual(canonicalize_url(url), url)
+        self.assertEqual(canonicalize_url('https://news.example/s?q=a%20b&utm%5Fsource=rss'),
+                         'https://news.example/s?q=a%20b')
+
+    def test_other_urls_are_left_alone(self):
+        for url in ('mailto:desk@news.example', 'urn:uuid:1234', 'https://[::1', '', None):
+            with self.subTest(url=url):
+                self.assertEqual(canonicalize_url(url), url)
+
+
+class URLKeyTests(SimpleTestCase):
+    def test_variants_share_a_key(self):
+        self.assertEqual(url_key('http://www.news.example/story?b=2&a=1&utm_campaign=x'),
+                         url_key('https://news.example/story?a=1&b=2'))
+        self.assertEqual(url_key('https://news.example/s?q=a%20b'), url_key('https://news.example/s?q=a+b'))
+
+    def test_different_stories_do_not(self):
+        self.assertNotEqual(url_key('https://news.example/story?id=1'), url_key('https://news.example/story?id=2'))
+        self.assertNotEqual(url_key('https://news.example/a'), url_key('https://other.example/a'))
+
+
+class ResolveCanonicalTests(SimpleTestCase):
+    def test_declared_canonical_wins(self):
+        self.assertEqual(
+            resolve_canonical('https://mirror.example/a?utm_source=rss', 'https://mirror.example/a', '/original'),
+            ('https://mirror.example/original', ['https://mirror.example/a'])
+        )
+
+    def test_site_root_is_ignored(self):
+        self.assertEqual(
+            resolve_canonical('https://news.example/r/1', 'https://news.example/story', 'https://news.example/'),
+            ('https://news.example/story', ['https://news.example/r/1'])
+        )
+
+
+def article(url, title, **extra):
+    return dict({
+        'url': url, 'title': title, 'summary': '', 'content': f'<p>{title}</p>', 'source': title,
+        'published_at': timezone.now() - timedelta(hours=1),
+    }, **extra)
+
+
+class SyndicatedCopyTests(TestCase):
+    ORIGINAL = 'https://news.example/story'
+    COPY = 'https://mirror.example/story'
+
+    def test_copy_of_stored_article_only_adds_an_alias(self):
+        with ArticleWriter() as writer:
+            writer.add(article(self.ORIGINAL, 'Original'))
+        with ArticleWriter() as writer:
+            writer.add(article(self.ORIGINAL, 'Copy', aliases=[self.COPY], canonical_declared=True))
+
+        stored = NewsArticle.objects.get()
+        self.assertEqual((stored.title, stored.source, stored.content), ('Original', 'Original', '<p>Original</p>'))
+        self.assertEqual(URLAlias.objects.get().alias, self.COPY)
+        self.assertEqual(writer.updated, 0)
+
+    def test_copy_in_the_same_batch_does_not_replace_the_original(self):
+        with ArticleWriter() as writer:
+            writer.add(article(self.ORIGINAL, 'Original'))
+            writer.add(article(self.ORIGINAL, 'Copy', aliases=[self.COPY], canonical_declared=True))
+
+        self.assertEqual(NewsArticle.objects.get().title, 'Original')
+        self.assertEqual(URLAlias.objects.get().canonical_url, self.ORIGINAL)
+
+    def test_copy_of_unstored_article_is_stored_under_it(self):
+        with ArticleWriter() as writer:
+            writer.add(article(self.ORIGINAL, 'Copy', aliases=[self.COPY], canonical_declared=True))
+        # The original page itself still replaces the copy
+        with ArticleWriter() as writer:
+            writer.add(article(self.ORIGINAL, 'Original'))
+
+        self.assertEqual(NewsArticle.objects.get().title, 'Original')
@@ -0,0 +1,92 @@
+import hashlib
+import logging
+from typing import Dict, Optional
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from .. import metrics
+from .. import search
+from ..models import NewsArticle
+from .article_fetcher import afetch_article_content
+
+logger = logging.getLogger(__name__)
+
+# Placeholder stored by the initial content migration, never real article text
+PLACEHOLDER_CONTENT = 'Default content goes here.'
+
+DETAIL_FIELDS = ('url', 'title', 'content', 'source', 'published_at')
+STORED_FIELDS = DETAIL_FIELDS + ('duplicate_of', 'duplicate_of__content')
+
+def _record(outcome: str) -> None:
+    """Count where a detail lookup found its content: cache_hit, db_hit or miss."""
+    metrics.DETAIL_LOOKUPS.inc(outcome=outcome)
+
+
+def _cache_key(url: str) -> str:
+    return 'article_detail:' + hashlib.md5(url.encode('utf-8')).hexdigest()
+
+
+def _ttl() -> int:
+    return getattr(settings, 'NEWS_ARTICLE_CACHE_TTL', 3600)
+
+
+def _has_content(content: Optional[str]) -> bool:
+    return bool(content and content.strip() and content != PLACEHOLDER_CONTENT)
+
+
+def _store_content(url: str, content: str) -> None:
+    """Keep live-fetched content on the stored article and in the search index."""
+    article = NewsArticle.objects.filter(url=url)
+    previous = search.previous_rows(article) if search.is_available() else []
+    article.update(content=content)
+    if search.is_available():
+        search.index_articles(article.values_list('id', 'title', 'summary', 'content'), previous)
+
+
+def _stored_detail(stored: Optional[Dict]) -> Optional[Dict]:
+    """
+    The detail fields of a stored article, from a values() row that also holds
+    the story's representative content. A duplicate is stored without content
+    and shows its story's instead.
+    """
+    if stored is None:
+        return None
+    story_content = stored.pop('duplicate_of__content')
+    if stored.pop('duplicate_of') is not None and not _has_content(stored['content']):
+        stored['content'] = story_content
+    return stored
+
+
+async def aget_article_detail(url: str) -> Optional[Dict]:
+    """
+    Return the article shown on the detail page.
+
+    Looks in the content cache first, then at the content stored at ingest time
+    (for a duplicate, its story's), and only scrapes the publisher page when
+    neither has it. A live fetch awaits the publisher instead of holding a
+    thread while a slow page loads, and is written back to the stored article
+    and to the cache.
+    """
+    key = _cache_key(url)
+
+    article = await cache.aget(key)
+    if article is not None:
+        _record('cache_hit')
+        return dict(article)
+
+    stored = _stored_detail(await NewsArticle.objects.filter(url=url).values(*STORED_FIELDS).afirst())
+    if stored and _has_content(stored['content']):
+        _record('db_hit')
+        await cache.aset(key, stored, _ttl())
+        return dict(stored)
+
+    _record('miss')
+    logger.info(f"Article detail miss, fetching live: {url}")
+    article = await afetch_article_content(url)
+    if article is None:
+        return None
+
+    if stored:
+        await sync_to_async(_store_content)(url, article['content'])
+    await cache.aset(key, article, _ttl())
+    return dict(article)
@@ -1,43 +1,66 @@
 import requests
-from bs4 import BeautifulSoup
+from asgiref.sync import sync_to_async
+from bs4 import BeautifulSoup, Tag
 import logging
 from datetime import datetime
 from urllib.parse import urlparse
-import xml.etree.ElementTree as ET
-from typing import Optional, List, Dict, Union
+from concurrent.futures import Executor
+from contextlib import nullcontext
+from dataclasses import dataclass
+from functools import lru_cache
+from django.conf import settings
+from typing import Optional, Iterable, List, Dict, Union
+from . import http_client
+from . import simhash
+from .. import metrics
+from .concurrency import HostLimiter
+from .feed_stream import iter_feed_items
+from .known_urls import KnownURLs
+from .substrings import SubstringIndex
+from .urls import canonicalize_url, resolve_canonical, url_key
 
 logger = logging.getLogger(__name__)
 
-def fetch_article_content(url: str) -> Optional[Union[List[Dict], Dict]]:
+# Article responses that may succeed when the feed is fetched again
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+@dataclass
+class FeedFetchResult:
+    """Outcome of a conditional feed fetch."""
+    articles: Optional[List[Dict]] = None
+    not_modified: bool = False
+    etag: str = ''
+    last_modified: str = ''
+    # False when some of the feed's items could not be downloaded
+    complete: bool = True
+
+def fetch_article_content(
+    url: str,
+    limiter: Optional[HostLimiter] = None,
+    executor: Optional[Executor] = None
+) -> Optional[Union[List[Dict], Dict]]:
     """
     Enhanced article content fetcher that handles both RSS feeds and regular articles.
     Supports multiple fallback methods for content extraction.
 
     Args:
         url: The URL to fetch content from
+        limiter: Optional per-host limiter every outgoing request waits on
+        executor: Optional executor used to fetch the items of an RSS feed concurrently
 
     Returns:
         Optional[Union[List[Dict], Dict]]: Article data or None if fetching fails
         For RSS feeds, returns a list of article dictionaries
         For single articles, returns a dictionary with article data
     """
-    print(f"Fetching articles from: {url}")
+    logger.info(f"Fetching articles from: {url}")
     try:
-        # Configure headers to mimic a browser
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8'
-        }
-
-        # Make the request
-        response = requests.get(url, headers=headers, timeout=15)
-        response.raise_for_status()
-
-        # Check if it's an XML (RSS) feed
-        if "xml" in response.headers.get("Content-Type", "") or url.endswith(".rss"):
-            return _process_rss_feed(response.content, url)
-        else:
-            return _process_html_article(response, url)
+        # Make the request through the shared pooled session
+        with _host_slot(limiter, url):
+            download = http_client.open_download(url)
+        with download:
+            download.raise_for_status()
+            return _process_response(download, url, limiter, executor)
 
     except requests.RequestException as e:
         logger.error(f"Request failed for {url}: {str(e)}")
@@ -46,56 +69,243 @@ def fetch_article_content(url: str) -> Optional[Union[List[Dict], Dict]]:
         logger.error(f"Unexpected error processing {url}: {str(e)}", exc_info=True)
         return None
 
-def _process_rss_feed(content: bytes, url: str) -> Optional[List[Dict]]:
-    """Process RSS feed content and return a list of articles with full content."""
+async def afetch_article_content(url: str) -> Optional[Dict]:
+    """
+    Fetch and extract a single article page without blocking the event loop,
+    for the async views.
+
+    The page is downloaded with httpx when it is installed; otherwise the
+    blocking fetch_article_content runs in a thread of its own. Extraction is
+    CPU-bound and always runs in a thread. Feeds are not followed here.
+    """
+    if http_client.httpx is None:
+        article = await sync_to_async(fetch_article_content, thread_sensitive=False)(url)
+        return article if isinstance(article, dict) else None
+
+    logger.info(f"Fetching article from: {url}")
     try:
-        root = ET.fromstring(content)
-        articles = []
-        
-        # Configure headers once for all requests
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8'
-        }
+        content, encoding = await http_client.afetch(url)
+        return await sync_to_async(_process_html_article, thread_sensitive=False)(content, encoding, url)
 
-        for item in root.findall(".//item"):
-            try:
-                title = item.find("title").text
-                link = item.find("link").text
-                published_date = item.find("pubDate").text
-
-                # Always fetch the full article content from the URL
-                article_response = requests.get(link, headers=headers, timeout=15)
-                if article_response.ok:
-                    article_data = _process_html_article(article_response, link)
-                    if article_data:
-                        # Preserve the RSS publication date as it's often more reliable
-                        article_data['published_at'] = datetime.strptime(
-                            published_date, 
-                            "%a, %d %b %Y %H:%M:%S %z"
-                        )
-                        articles.append(article_data)
-                    else:
-                        logger.warning(f"Failed to extract content from {link}")
-                else:
-                    logger.warning(f"Failed to fetch article from {link}: {article_response.status_code}")
-
-            except requests.RequestException as e:
-                logger.error(f"Request failed for article {link}: {str(e)}")
-                continue
-            except Exception as e:
-                logger.error(f"Error processing RSS item: {str(e)}")
-                continue
+    except (requests.RequestException, http_client.httpx.HTTPError) as e:
+        logger.error(f"Request failed for {url}: {str(e)}")
+        return None
+    except Exception as e:
+        logger.error(f"Unexpected error processing {url}: {str(e)}", exc_info=True)
+        return None
+
+def fetch_feed(
+    url: str,
+    etag: str = '',
+    last_modified: str = '',
+    limiter: Optional[HostLimiter] = None,
+    executor: Optional[Executor] = None,
+    known_urls: Optional[KnownURLs] = None,
+    extractor=None
+) -> FeedFetchResult:
+    """
+    Fetch a feed with a conditional GET using the validators from the previous fetch.
+
+    Returns:
+        FeedFetchResult: not_modified is set on a 304, in which case nothing is
+        parsed and no articles are fetched. Otherwise articles holds the parsed
+        articles and etag/last_modified the validators to send next time,
+        unless complete is unset because some items failed to download.
+        Items whose link is in known_urls are not downloaded again, and article
+        HTML is handed to the extractor (see extraction.py) when one is given.
+    """
+    headers = {}
+    if etag:
+        headers['If-None-Match'] = etag
+    if last_modified:
+        headers['If-Modified-Since'] = last_modified
+
+    try:
+        # Streamed, so the feed is parsed while it downloads and can be abandoned early
+        with _host_slot(limiter, url), metrics.stage('feed_fetch'):
+            download = http_client.open_download(
+                url, headers, max_bytes=getattr(settings, 'NEWS_MAX_FEED_BYTES', 10 * 1024 * 1024),
+                stage='feed_fetch'
+            )
+        with download:
+            if download.status_code == 304:
+                logger.info(f"Feed not modified: {url}")
+                return FeedFetchResult(not_modified=True, etag=etag, last_modified=last_modified)
+            with metrics.errors('feed_fetch'):
+                download.raise_for_status()
+
+            failed_links = []
+            articles = _process_response(download, url, limiter, executor, known_urls, extractor, failed_links)
+        if isinstance(articles, dict):
+            articles = [articles]
+        return FeedFetchResult(
+            articles=articles,
+            etag=download.headers.get('ETag', ''),
+            last_modified=download.headers.get('Last-Modified', ''),
+            complete=not failed_links
+        )
+
+    except requests.RequestException as e:
+        logger.error(f"Request failed for {url}: {str(e)}")
+    except Exception as e:
+        logger.error(f"Unexpected error processing {url}: {str(e)}", exc_info=True)
+    return FeedFetchResult()
+
+def _process_response(
+    download: http_client.Download,
+    url: str,
+    limiter: Optional[HostLimiter] = None,
+    executor: Optional[Executor] = None,
+    known_urls: Optional[KnownURLs] = None,
+    extractor=None,
+    failed_links: Optional[List[str]] = None
+) -> Optional[Union[List[Dict], Dict]]:
+    """Dispatch a download to the RSS or HTML processor by sniffing its first bytes."""
+    # Check if it's an XML (RSS) feed; anything else that is not HTML is abandoned
+    with metrics.errors(download.stage):
+        kind = download.require('feed', 'html')
+    if kind == 'feed':
+        return _process_rss_feed(download.iter_content(), url, limiter, executor, known_urls, extractor,
+                                 failed_links)
+    else:
+        return _process_html_article(download.content, download.encoding, url, extractor)
+
+def _host_slot(limiter: Optional[HostLimiter], url: str):
+    """Return the limiter slot for the URL's host, or a no-op context."""
+    return limiter.slot(url) if limiter else nullcontext()
+
+def _process_rss_feed(
+    content: Union[bytes, Iterable[bytes]],
+    url: str,
+    limiter: Optional[HostLimiter] = None,
+    executor: Optional[Executor] = None,
+    known_urls: Optional[KnownURLs] = None,
+    extractor=None,
+    failed_links: Optional[List[str]] = None
+) -> Optional[List[Dict]]:
+    """
+    Process RSS feed content and return a list of articles with full content.
+
+    The feed is parsed incrementally. Items whose link is already in known_urls
+    are skipped without a request, and since feeds list the newest items first,
+    parsing stops at the first item this feed stored before. An item stored from
+    another feed is only skipped, as it says nothing about the items below it.
+    The links of items whose download failed are appended to failed_links.
+    """
+    if isinstance(content, bytes):
+        content = [content]
 
-        return articles if articles else None
+    try:
+        items = []
+        # The feed body streams in while it is parsed, so this includes reading it
+        with metrics.stage('xml_parse'):
+            for item in iter_feed_items(content):
+                if known_urls is not None and known_urls.is_stored(item.get('link'), item.get('guid'), feed_url=url):
+                    logger.debug(f"Reached already stored items in {url}, stopping")
+                    break
+                if not (item.get('title') and item.get('link') and item.get('pubDate')):
+                    logger.error(f"Error processing RSS item: missing title, link or pubDate in {url}")
+                    continue
+                # Without tracking parameters, so syndicated copies are recognized before any GET
+                items.append((item['title'], canonicalize_url(item['link']), item['pubDate']))
+
+        if known_urls is not None:
+            new_links = set(known_urls.claim_new([link for _, link, _ in items]))
+            items = [item for item in items if item[1] in new_links]
+
+        def fetch(item):
+            article = _fetch_rss_item(*item, limiter=limiter, extractor=extractor, failed_links=failed_links)
+            if article is None and known_urls is not None:
+                known_urls.release(item[1])
+            return article
+
+        # Fetch the item pages concurrently when an executor is supplied
+        results = executor.map(fetch, items) if executor else map(fetch, items)
+        articles = [article for article in results if article]
+
+        # An empty list means every item was already stored, which is not a failure
+        return articles if articles or not items else None
         
     except Exception as e:
         logger.error(f"Error processing RSS feed: {str(e)}")
         return None
 
-def _process_html_article(response: requests.Response, url: str) -> Optional[Dict]:
+def _fetch_rss_item(
+    title: str,
+    link: str,
+    published_date: str,
+    limiter: Optional[HostLimiter] = None,
+    extractor=None,
+    failed_links: Optional[List[str]] = None
+) -> Optional[Dict]:
+    """
+    Fetch the full article behind a single RSS item.
+
+    The link is appended to failed_links when the download failed in a way
+    worth retrying: a request error, a server error or rate limiting. Pages
+    that are gone or yield no article would fail again, so they are not.
+    """
+    try:
+        # Always fetch the full article content from the URL, holding the host slot
+        # until the body is read; non-HTML and oversized bodies are abandoned early
+        with _host_slot(limiter, link), metrics.stage('article_fetch'), \
+                http_client.open_download(link) as article_response:
+            if not article_response.ok:
+                metrics.count_error('article_fetch', 'HTTPError')
+                logger.warning(f"Failed to fetch article from {link}: {article_response.status_code}")
+                if failed_links is not None and article_response.status_code in RETRY_STATUSES:
+                    failed_links.append(link)
+                return None
+            article_response.require('html')
+            content = article_response.content
+
+        article_data = _process_html_article(content, article_response.encoding, link, extractor)
+        if article_data:
+            # Preserve the RSS publication date as it's often more reliable
+            article_data['published_at'] = datetime.strptime(
+                published_date, 
+                "%a, %d %b %Y %H:%M:%S %z"
+            )
+            # Stored under the URL the publisher calls canonical, remembering the others
+            article_data['url'], article_data['aliases'] = resolve_canonical(
+                link, article_response.url, article_data.pop('canonical_url', None)
+            )
+            # Another page's URL, whose article must not be overwritten with this copy
+            article_data['canonical_declared'] = url_key(article_data['url']) != url_key(article_response.url or link)
+            return article_data
+        else:
+            logger.warning(f"Failed to extract content from {link}")
+
+    except requests.RequestException as e:
+        logger.error(f"Request failed for article {link}: {str(e)}")
+        if failed_links is not None:
+            failed_links.append(link)
+    except Exception as e:
+        logger.error(f"Error processing RSS item: {str(e)}")
+    return None
+
+def _process_html_article(
+    content: bytes,
+    encoding: Optional[str],
+    url: str,
+    extractor=None
+) -> Optional[Dict]:
     """Process HTML article content and return article data."""
-    soup = BeautifulSoup(response.content, 'html.parser', from_encoding=response.encoding)
+    with metrics.stage('html_extract'):
+        if extractor is not None:
+            return extractor.extract(content, url, encoding)
+        return extract_article(content, url, encoding)
+
+def extract_article(content: bytes, url: str, encoding: Optional[str] = None) -> Optional[Dict]:
+    """
+    Turn raw article HTML into a plain dict of article data.
+
+    This is the CPU-bound stage of ingestion; it only takes and returns plain
+    values so it can run in a worker process.
+    """
+    soup = BeautifulSoup(content, get_html_parser(), from_encoding=encoding)
+    # Read before cleaning, which removes link tags
+    canonical_url = _extract_canonical(soup)
     _clean_html(soup)
 
     content = _extract_content(soup)
@@ -108,28 +318,52 @@ def _process_html_article(response: requests.Response, url: str) -> Optional[Dic
         'content': content,
         'source': _extract_source(soup, url),
         'published_at': _extract_date(soup),
-        'url': url
+        'url': url,
+        'canonical_url': canonical_url,
+        # Fingerprint for near-duplicate detection, computed here off the fetch threads
+        'simhash': simhash.fingerprint(content)
     }
 
+@lru_cache(maxsize=None)
+def get_html_parser() -> str:
+    """
+    BeautifulSoup tree builder for article pages: NEWS_HTML_PARSER when set,
+    otherwise the built-in html.parser.
+
+    lxml is faster but repairs malformed markup differently (it closes a <p>
+    at a nested <div>, for one), which changes the extracted paragraphs, so it
+    is only used when configured.
+    """
+    return getattr(settings, 'NEWS_HTML_PARSER', None) or 'html.parser'
+
+UNWANTED_TAGS = frozenset([
+    'script', 'style', 'iframe', 'img', 'button', 'input', 'nav',
+    'footer', 'header', 'aside', 'form', 'noscript', 'figure',
+    'meta', 'link', 'svg', 'path'
+])
+
 def _clean_html(soup: BeautifulSoup) -> None:
-    """Remove unwanted elements from the HTML content."""
-    # Remove hidden elements
-    for hidden in soup.find_all(style=lambda value: value and 'display:none' in value.lower()):
-        hidden.decompose()
-
-    # Remove unwanted tags
-    unwanted_tags = [
-        'script', 'style', 'iframe', 'img', 'button', 'input', 'nav',
-        'footer', 'header', 'aside', 'form', 'noscript', 'figure',
-        'meta', 'link', 'svg', 'path'
-    ]
-    for tag in unwanted_tags:
-        for element in soup.find_all(tag):
-            element.decompose()
+    """
+    Remove unwanted and hidden elements and convert links to text in a single
+    walk over the tree. Removed subtrees are never visited.
+    """
+    anchors = []
+    stack = [soup]
+    while stack:
+        for child in list(stack.pop().children):
+            if not isinstance(child, Tag):
+                continue
+            style = child.attrs.get('style')
+            if child.name in UNWANTED_TAGS or (style and 'display:none' in style.lower()):
+                child.decompose()
+                continue
+            if child.name == 'a':
+                anchors.append(child)
+            stack.append(child)
 
-    # Convert links to text
-    for a in soup.find_all('a'):
-        a.replaceWith(a.text.strip())
+    # Innermost links first, so every link's text is taken from its cleaned subtree
+    for a in reversed(anchors):
+        a.replace_with(a.text.strip())
 
 def _extract_content(soup: BeautifulSoup) -> Optional[str]:
     """Extract content using multiple fallback methods."""
@@ -178,19 +412,52 @@ def _extract_content(soup: BeautifulSoup) -> Optional[str]:
             formatted_content += f"<h3>{text}</h3>\n"
 
     # Process paragraphs and other text containers
-    seen_paragraphs = set()
-    for element in content.find_all(['p', 'div']):
-        text = element.text.strip()
-        if (text 
-            and len(text) > 30
-            and text not in seen_paragraphs
-            and not any(text in p for p in seen_paragraphs)
-            and len(text.split()) > 5):
-            seen_paragraphs.add(text)
-            formatted_content += f"<p>{text}</p>\n"
+    for text in _outer_paragraph_texts(content):
+        formatted_content += f"<p>{text}</p>\n"
 
     return formatted_content if formatted_content.strip() else None
 
+# Shorter paragraphs are dropped
+MIN_PARAGRAPH_LENGTH = 31
+
+def _outer_paragraph_texts(content: Tag) -> List[str]:
+    """
+    Texts of the <p>/<div> elements in document order, skipping any that occur
+    inside a text already kept.
+
+    A nested element's text is a substring of its ancestor's, so once an ancestor
+    has been kept or rejected its subtree can be skipped without reading it: each
+    element's text is computed at most once. Containment in the kept texts is
+    looked up through an index of their windows rather than by scanning them all.
+    """
+    kept = SubstringIndex(min_length=MIN_PARAGRAPH_LENGTH)
+    texts = []
+    stack = [iter(content.children)]
+    while stack:
+        child = next(stack[-1], None)
+        if child is None:
+            stack.pop()
+            continue
+        if not isinstance(child, Tag):
+            continue
+        if child.name not in ('p', 'div'):
+            stack.append(iter(child.children))
+            continue
+
+        text = child.text.strip()
+        if (text
+            and len(text) >= MIN_PARAGRAPH_LENGTH
+            and len(text.split()) > 5
+            and text not in kept):
+            kept.add(text)
+            texts.append(text)
+    return texts
+
+def _extract_canonical(soup: BeautifulSoup) -> Optional[str]:
+    """The href of the page's <link rel="canonical">, if it has one."""
+    link = soup.find('link', rel='canonical', href=True)
+    return link['href'] if link else None
+
 def _extract_title(soup: BeautifulSoup) -> str:
     """Extract article title using multiple methods."""
     title_candidates = [
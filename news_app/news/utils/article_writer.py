@@ -0,0 +1,226 @@
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from .. import cache as news_cache
+from .. import facets
+from .. import metrics
+from .. import search
+from ..models import NewsArticle, URLAlias
+from . import simhash
+from .dedup import StoryClusterer
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class FlushResult:
+    """Rows written by a single flush."""
+    inserted: int = 0
+    updated: int = 0
+
+class ArticleWriter:
+    """
+    Buffers normalized articles and writes them in batches with a single
+    insert-or-update on conflict with the unique url column.
+
+    Use it as a context manager, or call flush() once the last article was added.
+    """
+    # Columns overwritten when an article with the same url already exists
+    UPDATE_FIELDS = ['title', 'content', 'published_at', 'source', 'news_source', 'rss_link', 'category',
+                     'simhash', 'simhash_band0', 'simhash_band1', 'simhash_band2', 'simhash_band3']
+
+    def __init__(self, batch_size: Optional[int] = None, update_fields: Optional[List[str]] = None):
+        self.batch_size = batch_size or getattr(settings, 'NEWS_INGEST_BATCH_SIZE', 200)
+        self.update_fields = update_fields or self.UPDATE_FIELDS
+        self.inserted = 0
+        self.updated = 0
+        self._buffer: Dict[str, NewsArticle] = {}
+        # Other URLs of the buffered articles, mapped to the url they are stored under
+        self._aliases: Dict[str, str] = {}
+        # Buffered urls taken from another page's rel=canonical, see add()
+        self._declared: Set[str] = set()
+        self.clusterer = StoryClusterer()
+        self.duplicates = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.flush()
+
+    def add(self, article_data: Dict) -> bool:
+        """Buffer one article, flushing when the batch is full. Returns False if it was unusable."""
+        article = self._normalize(article_data)
+        if article is None:
+            return False
+
+        # The last version of a url within a batch wins, except that a copy stored
+        # under the url its page declares canonical never replaces that article:
+        # it only adds its own URLs as aliases, here and in flush()
+        if not (article_data.get('canonical_declared') and article.url in self._buffer):
+            self._buffer[article.url] = article
+            if article_data.get('canonical_declared'):
+                self._declared.add(article.url)
+            else:
+                self._declared.discard(article.url)
+        for alias in article_data.get('aliases') or ():
+            self._aliases[alias] = article.url
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+        return True
+
+    def extend(self, articles: Iterable[Dict]) -> int:
+        """Buffer several articles, returning how many were accepted."""
+        return sum(1 for article_data in articles if isinstance(article_data, dict) and self.add(article_data))
+
+    def flush(self) -> FlushResult:
+        """Write the buffered articles in one transaction."""
+        if not self._buffer:
+            return FlushResult()
+
+        articles = list(self._buffer.values())
+        aliases = self._aliases
+        declared = self._declared
+        self._buffer = {}
+        self._aliases = {}
+        self._declared = set()
+
+        with metrics.stage('db_write'), transaction.atomic():
+            existing = {
+                url: (category, news_source_id, published_at, duplicate_of_id)
+                for url, category, news_source_id, published_at, duplicate_of_id in
+                NewsArticle.objects.filter(url__in=[article.url for article in articles])
+                .values_list('url', 'category', 'news_source_id', 'published_at', 'duplicate_of_id')
+            }
+            # Copies naming an already stored article as canonical leave it untouched
+            copies = declared.intersection(existing)
+            if copies:
+                articles = [article for article in articles if article.url not in copies]
+                for url in copies:
+                    del existing[url]
+            # Only new articles are clustered; stored duplicates stay without their content
+            pending = self.clusterer.assign([article for article in articles if article.url not in existing])
+            for article in articles:
+                if article.url in existing and existing[article.url][3] is not None:
+                    article.content = ''
+            # What the index holds for the rows about to be overwritten
+            previous = search.previous_rows(NewsArticle.objects.filter(url__in=list(existing))) \
+                if existing and search.is_available() else []
+            NewsArticle.objects.bulk_create(
+                articles,
+                update_conflicts=True,
+                unique_fields=['url'],
+                update_fields=self.update_fields
+            )
+            ids = self._ids(articles) if pending or search.is_available() else {}
+            self._link_duplicates(pending, ids)
+            self._update_search_index(articles, ids, previous)
+            self._facet_delta(articles, existing, {article.url for article, _ in pending}).apply()
+            self._save_aliases(aliases)
+
+        news_cache.invalidate_articles()
+
+        result = FlushResult(inserted=len(articles) - len(existing), updated=len(existing))
+        self.duplicates += sum(1 for article in articles
+                               if article.url not in existing and article.duplicate_of_id is not None)
+        metrics.ARTICLES_WRITTEN.inc(result.inserted, result='inserted')
+        metrics.ARTICLES_WRITTEN.inc(result.updated, result='updated')
+        self.inserted += result.inserted
+        self.updated += result.updated
+        logger.info(f"Flushed {len(articles)} articles: {result.inserted} inserted, {result.updated} updated")
+        return result
+
+    def _ids(self, articles: List[NewsArticle]) -> Dict[str, int]:
+        """Primary keys of the articles just written, by url."""
+        return dict(
+            NewsArticle.objects.filter(url__in=[article.url for article in articles])
+            .values_list('url', 'id')
+        )
+
+    def _link_duplicates(self, pending, ids: Dict[str, int]) -> None:
+        """Point articles that repeat another article of the batch at it, now that both have ids."""
+        linked = []
+        for duplicate, representative in pending:
+            if duplicate.url in ids and representative.url in ids:
+                duplicate.pk = ids[duplicate.url]
+                duplicate.duplicate_of_id = ids[representative.url]
+                linked.append(duplicate)
+        NewsArticle.objects.bulk_update(linked, ['duplicate_of'])
+
+    def _update_search_index(self, articles: List[NewsArticle], ids: Dict[str, int], previous) -> None:
+        """Index the text of the articles just written, in the same transaction."""
+        if not search.is_available():
+            return
+
+        search.index_articles(
+            ((ids[article.url], article.title, article.summary, article.content)
+             for article in articles if article.url in ids),
+            previous
+        )
+
+    def _save_aliases(self, aliases: Dict[str, str]) -> None:
+        """Remember the other URLs of the articles just written."""
+        if not aliases:
+            return
+        URLAlias.objects.bulk_create(
+            [URLAlias(alias=alias, canonical_url=url) for alias, url in aliases.items()],
+            update_conflicts=True,
+            unique_fields=['alias'],
+            update_fields=['canonical_url']
+        )
+
+    def _facet_delta(self, articles: List[NewsArticle], existing: Dict, pending_urls) -> facets.FacetDelta:
+        """Facet changes from inserting the new articles and updating the existing ones."""
+        delta = facets.FacetDelta()
+        for article in articles:
+            if article.url not in existing:
+                # Duplicates are not counted, only the story they repeat
+                if article.duplicate_of_id is None and article.url not in pending_urls:
+                    delta.add(article.category, article.news_source_id, article.published_at)
+                continue
+
+            # Columns outside update_fields keep their stored value
+            old_category, old_source_id, old_published_at, duplicate_of_id = existing[article.url]
+            if duplicate_of_id is not None:
+                continue
+            delta.remove(old_category, old_source_id, old_published_at)
+            delta.add(
+                article.category if 'category' in self.update_fields else old_category,
+                article.news_source_id if 'news_source' in self.update_fields else old_source_id,
+                article.published_at if 'published_at' in self.update_fields else old_published_at
+            )
+        return delta
+
+    def _normalize(self, article_data: Dict) -> Optional[NewsArticle]:
+        """Turn a fetched article dict into an unsaved NewsArticle."""
+        url = (article_data.get('url') or '').strip()
+        if not url:
+            return None
+
+        published_at = article_data.get('published_at')
+        if not isinstance(published_at, datetime):
+            published_at = timezone.now()
+        elif timezone.is_naive(published_at):
+            published_at = timezone.make_aware(published_at, timezone.get_default_timezone())
+
+        fingerprint = article_data.get('simhash')
+        band_values = simhash.bands(fingerprint) if fingerprint is not None else (None,) * simhash.BANDS
+        return NewsArticle(
+            url=url,
+            title=(article_data.get('title') or '')[:500],
+            summary=article_data.get('summary') or '',
+            content=article_data.get('content') or '',
+            published_at=published_at,
+            source=(article_data.get('source') or '')[:200],
+            news_source_id=article_data.get('news_source_id'),
+            rss_link_id=article_data.get('rss_link_id'),
+            category=(article_data.get('category') or 'General')[:100],
+            simhash=simhash.to_signed(fingerprint),
+            simhash_band0=band_values[0],
+            simhash_band1=band_values[1],
+            simhash_band2=band_values[2],
+            simhash_band3=band_values[3]
+        )
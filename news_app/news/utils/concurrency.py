@@ -0,0 +1,70 @@
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from urllib.parse import urlparse
+
+
+class HostLimiter:
+    """Caps the number of simultaneous requests made to any single host."""
+
+    def __init__(self, per_host_limit: int):
+        self.per_host_limit = max(1, per_host_limit)
+        self._semaphores = {}
+        self._lock = threading.Lock()
+
+    def _semaphore_for(self, host: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            semaphore = self._semaphores.get(host)
+            if semaphore is None:
+                semaphore = threading.BoundedSemaphore(self.per_host_limit)
+                self._semaphores[host] = semaphore
+            return semaphore
+
+    @contextmanager
+    def slot(self, url: str):
+        """Block until a request slot for the URL's host is free."""
+        semaphore = self._semaphore_for(urlparse(url).netloc.lower())
+        with semaphore:
+            yield
+
+
+@dataclass
+class IngestStats:
+    """Counters and throughput for a single ingestion run."""
+    feeds: int = 0
+    feeds_failed: int = 0
+    feeds_not_modified: int = 0
+    articles: int = 0
+    inserted: int = 0
+    updated: int = 0
+    articles_skipped: int = 0
+    duplicates: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+    finished_at: float = None
+
+    def finish(self) -> None:
+        self.finished_at = time.monotonic()
+
+    @property
+    def elapsed(self) -> float:
+        end = self.finished_at if self.finished_at is not None else time.monotonic()
+        return max(end - self.started_at, 1e-9)
+
+    @property
+    def feeds_per_sec(self) -> float:
+        return self.feeds / self.elapsed
+
+    @property
+    def articles_per_sec(self) -> float:
+        return self.articles / self.elapsed
+
+    def summary(self) -> str:
+        return (
+            f"{self.feeds} feeds ({self.feeds_not_modified} not modified, "
+            f"{self.feeds_failed} failed), {self.articles} articles "
+            f"({self.inserted} inserted, {self.updated} updated, "
+            f"{self.articles_skipped} already stored, {self.duplicates} duplicates) "
+            f"in {self.elapsed:.1f}s - {self.feeds_per_sec:.2f} feeds/sec, "
+            f"{self.articles_per_sec:.2f} articles/sec"
+        )
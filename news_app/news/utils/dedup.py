@@ -0,0 +1,117 @@
+from datetime import timedelta
+from typing import List, NamedTuple, Tuple
+from django.conf import settings
+from django.db.models import Q
+from .. import facets
+from .. import search
+from ..models import NewsArticle
+from . import simhash
+
+
+class StoredStory(NamedTuple):
+    """A story representative already in the database, as a clustering candidate."""
+    id: int
+    title: str
+
+
+def title_similarity(a: str, b: str) -> float:
+    """Share of the words of two titles that they have in common (Jaccard index)."""
+    words_a = set(simhash.WORD_RE.findall((a or '').lower()))
+    words_b = set(simhash.WORD_RE.findall((b or '').lower()))
+    if not words_a or not words_b:
+        return 0.0
+    return len(words_a & words_b) / len(words_a | words_b)
+
+
+class StoryClusterer:
+    """
+    Groups new articles with the story they repeat, e.g. the same wire copy
+    from several publishers.
+
+    Candidates are the story representatives that share a SimHash band with an
+    article, found through the band indexes with one query per batch, and
+    confirmed by the number of differing bits. Text shared by unrelated
+    articles, such as a publisher's paywall or consent notice, can make their
+    fingerprints match, so the titles must match too. Only stories published
+    within the window are considered.
+    """
+
+    def __init__(self, max_distance=None, window_days=None, min_title_similarity=None):
+        self.max_distance = (max_distance if max_distance is not None
+                             else getattr(settings, 'NEWS_DUPLICATE_MAX_DISTANCE', 3))
+        self.window = timedelta(days=window_days or getattr(settings, 'NEWS_DUPLICATE_WINDOW_DAYS', 7))
+        self.min_title_similarity = (min_title_similarity if min_title_similarity is not None
+                                     else getattr(settings, 'NEWS_DUPLICATE_MIN_TITLE_SIMILARITY', 0.5))
+
+    def assign(self, articles: List[NewsArticle]) -> List[Tuple[NewsArticle, NewsArticle]]:
+        """
+        Mark the unsaved articles that repeat a story: their duplicate_of is set
+        when the story is already stored and their content is dropped, since the
+        story's representative holds it.
+
+        Returns (duplicate, representative) pairs for articles repeating another
+        article of the same batch, which can only be linked once both are saved.
+        """
+        fingerprinted = [article for article in articles if article.simhash is not None]
+        if not fingerprinted:
+            return []
+
+        index = simhash.BandIndex()
+        for story_id, title, value in self._candidates(fingerprinted):
+            index.add(simhash.to_unsigned(value), StoredStory(story_id, title))
+
+        pending = []
+        for article in fingerprinted:
+            value = simhash.to_unsigned(article.simhash)
+            representative = index.nearest(
+                value, self.max_distance,
+                accept=lambda story: title_similarity(article.title, story.title) >= self.min_title_similarity
+            )
+            if representative is None:
+                # A new story, which later articles of the batch may repeat
+                index.add(value, article)
+                continue
+
+            article.content = ''
+            if isinstance(representative, NewsArticle):
+                pending.append((article, representative))
+            else:
+                article.duplicate_of_id = representative.id
+        return pending
+
+    def _candidates(self, articles: List[NewsArticle]):
+        band_values = list(zip(*(simhash.bands(simhash.to_unsigned(article.simhash)) for article in articles)))
+        matches_band = Q()
+        for band, values in enumerate(band_values):
+            matches_band |= Q(**{f'simhash_band{band}__in': set(values)})
+
+        since = min(article.published_at for article in articles) - self.window
+        return NewsArticle.objects.filter(matches_band, duplicate_of__isnull=True, published_at__gte=since)\
+                                  .exclude(url__in=[article.url for article in articles])\
+                                  .values_list('id', 'title', 'simhash')
+
+
+def promote_duplicate(sender, instance, **kwargs):
+    """
+    pre_delete handler for NewsArticle: when a story's representative goes, its
+    oldest duplicate takes over, with the story's content, and the others follow it.
+    """
+    if instance.duplicate_of_id is not None:
+        return
+    successor = NewsArticle.objects.filter(duplicate_of=instance).order_by('id').first()
+    if successor is None:
+        return
+
+    NewsArticle.objects.filter(duplicate_of=instance).exclude(pk=successor.pk).update(duplicate_of=successor)
+    promoted = NewsArticle.objects.filter(pk=successor.pk)
+    if successor.content.strip():
+        promoted.update(duplicate_of=None)
+    else:
+        # Duplicates are stored without content
+        previous = search.previous_rows(promoted) if search.is_available() else []
+        promoted.update(duplicate_of=None, content=instance.content)
+        if search.is_available():
+            search.index_articles(promoted.values_list('id', 'title', 'summary', 'content'), previous)
+    delta = facets.FacetDelta()
+    delta.add(successor.category, successor.news_source_id, successor.published_at)
+    delta.apply()
@@ -0,0 +1,60 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional
+import django
+from .article_fetcher import extract_article
+
+
+class InlineExtractor:
+    """Runs article extraction on the calling thread."""
+
+    def extract(self, content: bytes, url: str, encoding: Optional[str] = None) -> Optional[Dict]:
+        return extract_article(content, url, encoding)
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class ProcessPoolExtractor(InlineExtractor):
+    """
+    Runs article extraction in a pool of worker processes so HTML parsing uses
+    every core and overlaps with network I/O on the fetch threads.
+
+    Fetch threads pass raw bytes and the URL and get plain dicts back. At most
+    max_pending documents are queued or in flight at once; further callers block
+    until a slot frees up, which caps the memory held by pending pages.
+    """
+
+    def __init__(self, workers: Optional[int] = None, max_pending: Optional[int] = None):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or self.workers * 2
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        # Workers are spawned rather than forked from a process full of fetch threads,
+        # and set Django up before unpickling their first task
+        self._pool = ProcessPoolExecutor(
+            self.workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=django.setup
+        )
+
+    def extract(self, content: bytes, url: str, encoding: Optional[str] = None) -> Optional[Dict]:
+        with self._slots:
+            return self._pool.submit(extract_article, content, url, encoding).result()
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+
+def build_extractor(workers: Optional[int]) -> InlineExtractor:
+    """A process pool with the given worker count, or inline extraction when it is 0."""
+    if workers == 0:
+        return InlineExtractor()
+    return ProcessPoolExtractor(workers)
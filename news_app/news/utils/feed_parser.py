@@ -1,13 +1,23 @@
 import feedparser
 import logging
-from .article_fetcher import fetch_article_content  # Import the article fetcher function
-from ..models import RSSLink, NewsArticle  # Assuming RSSLink model exists
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import nullcontext
+from django.conf import settings
+from django.utils import timezone
+from .article_fetcher import fetch_article_content, fetch_feed, FeedFetchResult
+from .article_writer import ArticleWriter
+from .concurrency import HostLimiter, IngestStats
+from .extraction import build_extractor
+from .known_urls import KnownURLs
+from .. import metrics
+from ..models import RSSLink, FeedSource
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
 class FeedParser:
-    def __init__(self):
+    def __init__(self, max_workers=None, per_host_limit=None, batch_size=None, force=False,
+                 extract_workers=None):
         self.date_formats = [
             '%a, %d %b %Y %H:%M:%S %z',
             '%Y-%m-%dT%H:%M:%S%z',
@@ -15,36 +25,106 @@ class FeedParser:
             '%a, %d %b %Y %H:%M:%S GMT',
             '%Y-%m-%dT%H:%M:%SZ'
         ]
+        # Global concurrency for feed and article downloads, and the cap per host
+        self.max_workers = max_workers or getattr(settings, 'NEWS_INGEST_MAX_WORKERS', 16)
+        self.per_host_limit = per_host_limit or getattr(settings, 'NEWS_INGEST_PER_HOST_LIMIT', 4)
+        self.batch_size = batch_size
+        # Re-download articles that are already stored, e.g. to refresh their content
+        self.force = force
+        # Processes parsing article HTML; 0 parses on the fetch threads, None uses every core
+        self.extract_workers = (extract_workers if extract_workers is not None
+                                else getattr(settings, 'NEWS_EXTRACT_WORKERS', None))
 
     def fetch_all_feeds(self):
-        """Fetch all RSS feed URLs from the database."""
-        rss_links = RSSLink.objects.all()  # Get all RSSLink entries from the database
-        for link in rss_links:
-            url = link.url  # Assuming 'url' is the field where the RSS feed link is stored
-            logger.info(f"Fetching content from {url}")  # Log for debugging
-
-            # Fetch articles using the fetch_article_content function
-            articles = fetch_article_content(url)
-            if articles:
-                for article_data in articles:
-                    if isinstance(article_data, dict):  # Ensure it's a dictionary
-                        # Save or update the article in the NewsArticle model
-                        article, created = NewsArticle.objects.update_or_create(
-                            title=article_data.get('title', ''),
-                            defaults={
-                                'url': article_data.get('url', ''),
-                                'published_at': article_data.get('published_at', ''),
-                                'content': article_data.get('content', ''),
-                                'source': article_data.get('source', ''),
-                                'category': article_data.get('category', 'General')
-                            }
-                        )
-                        if created:
-                            logger.info(f"Article '{article_data.get('title')}' added.")
-                        else:
-                            logger.info(f"Article '{article_data.get('title')}' already exists.")
-            else:
-                logger.warning(f"No articles fetched from {url}.")
+        """Fetch all RSS feed URLs from the database concurrently."""
+        return self.fetch_feeds(RSSLink.objects.all())  # Get all RSSLink entries from the database
+
+    def build_extractor(self):
+        """The article extraction stage configured for this parser."""
+        return build_extractor(self.extract_workers)
+
+    def fetch_feeds(self, rss_links, known_urls=None, on_feed_done=None, extractor=None):
+        """
+        Fetch the given RSS links concurrently and store their articles.
+
+        known_urls and extractor can be shared between runs to avoid reloading
+        the URLs or restarting worker processes, and on_feed_done(link, result)
+        is called on this thread once per feed.
+        """
+        stats = IngestStats()
+        limiter = HostLimiter(self.per_host_limit)
+        writer = ArticleWriter(self.batch_size)
+        if self.force:
+            known_urls = None
+        elif known_urls is None:
+            known_urls = KnownURLs.from_database()
+        skipped_before = known_urls.skipped if known_urls else 0
+        rss_links = list(rss_links)
+        metrics.track_feed_sites(link.url for link in rss_links)
+
+        # Feeds and their articles run on separate pools so a feed waiting on its
+        # articles can never starve the article pool. Database writes stay on this thread.
+        with (nullcontext(extractor) if extractor else self.build_extractor()) as extractor, \
+                ThreadPoolExecutor(self.max_workers, thread_name_prefix='feed') as feed_pool, \
+                ThreadPoolExecutor(self.max_workers, thread_name_prefix='article') as article_pool:
+            futures = {
+                feed_pool.submit(
+                    fetch_feed, link.url, link.etag, link.last_modified,
+                    limiter, article_pool, known_urls, extractor
+                ): link
+                for link in rss_links
+            }
+            for future in as_completed(futures):
+                link = futures[future]
+                stats.feeds += 1
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.error(f"Error fetching feed {link.url}: {str(e)}")
+                    result = FeedFetchResult()
+
+                if result.not_modified:
+                    stats.feeds_not_modified += 1
+                    self._mark_fetched(link, result)
+                elif result.articles is not None:
+                    for article_data in result.articles:
+                        article_data['news_source_id'] = link.source_id
+                        article_data['rss_link_id'] = link.id
+                    stats.articles += writer.extend(result.articles)
+                    if known_urls is not None:
+                        known_urls.mark_stored([
+                            url for article_data in result.articles
+                            for url in [article_data['url'], *article_data.get('aliases', ())]
+                        ], feed_url=link.url)
+                    self._mark_fetched(link, result)
+                else:
+                    stats.feeds_failed += 1
+                    logger.warning(f"No articles fetched from {link.url}.")
+
+                if on_feed_done:
+                    on_feed_done(link, result)
+
+        writer.flush()
+        stats.inserted, stats.updated = writer.inserted, writer.updated
+        stats.duplicates = writer.duplicates
+        stats.articles_skipped = known_urls.skipped - skipped_before if known_urls else 0
+        stats.finish()
+        logger.info(f"Feed refresh finished: {stats.summary()}")
+        return stats
+
+    def _mark_fetched(self, link, result):
+        """
+        Remember when the feed was last fetched, and its validators once every
+        item was processed. After a partial failure the previous validators are
+        kept, so the next conditional GET fetches the feed again and retries
+        the failed items instead of getting a 304.
+        """
+        now = timezone.now()
+        fields = {'last_fetched': now}
+        if result.complete:
+            fields.update(etag=result.etag[:255], last_modified=result.last_modified[:100])
+        RSSLink.objects.filter(pk=link.pk).update(**fields)
+        FeedSource.objects.filter(url=link.url).update(last_fetched=now)
 
     def fetch_feed(self, feed_url):
         """Fetch and parse a single RSS feed."""
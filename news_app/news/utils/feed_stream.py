@@ -0,0 +1,57 @@
+import xml.etree.ElementTree as ET
+from typing import Dict, Iterable, Iterator, List
+
+# Item children copied out of the tree before the element is freed
+ITEM_FIELDS = ('title', 'link', 'pubDate', 'guid', 'description')
+
+CHUNK_SIZE = 16 * 1024
+
+
+def _local_name(tag: str) -> str:
+    """Tag name without its XML namespace."""
+    return tag.rsplit('}', 1)[-1] if isinstance(tag, str) else ''
+
+
+def iter_feed_items(chunks: Iterable[bytes]) -> Iterator[Dict[str, str]]:
+    """
+    Incrementally parse an RSS document, yielding each <item> as a dict of its
+    text fields as soon as the item is complete.
+
+    Every item is removed from the tree once it has been read, so memory stays
+    flat however long the feed is, and the caller can stop iterating (and stop
+    reading the response) at any point. Raises ET.ParseError on malformed XML.
+    """
+    parser = ET.XMLPullParser(events=('start', 'end'))
+    open_elements: List[ET.Element] = []
+
+    for chunk in chunks:
+        parser.feed(chunk)
+        yield from _read_items(parser, open_elements)
+    parser.close()
+    yield from _read_items(parser, open_elements)
+
+
+def _read_items(parser: ET.XMLPullParser, open_elements: List[ET.Element]) -> Iterator[Dict[str, str]]:
+    for event, element in parser.read_events():
+        if event == 'start':
+            open_elements.append(element)
+            continue
+
+        open_elements.pop()
+        if _local_name(element.tag) != 'item':
+            continue
+
+        item = {}
+        for child in element:
+            name = _local_name(child.tag)
+            if name not in ITEM_FIELDS:
+                continue
+            # Plain RSS elements win over namespaced ones such as <atom:link>
+            if child.tag == name or not item.get(name):
+                item[name] = child.text
+
+        # Free the item; its parent would otherwise keep every item alive
+        element.clear()
+        if open_elements:
+            open_elements[-1].remove(element)
+        yield item
@@ -0,0 +1,376 @@
+import asyncio
+import atexit
+import logging
+import re
+import threading
+import time
+from typing import Iterator, Optional, Tuple
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from .. import metrics
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+# Headers sent with every request, mimicking a browser
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8'
+}
+
+RETRY_STATUSES = (500, 502, 503, 504)
+
+CHUNK_SIZE = 16 * 1024
+
+# Root elements that identify an HTML page or a feed, matched at the start of the
+# first chunk once the prolog is skipped
+HTML_SIGNATURES = (b'<html', b'<head', b'<body')
+FEED_SIGNATURES = (b'<rss', b'<feed', b'<rdf:rdf')
+# What may precede the root element: whitespace, comments, the XML declaration
+# and other processing instructions, and the doctype
+PROLOG_RE = re.compile(rb'\s*(?:<!--.*?-->|<\?.*?\?>|<!doctype[^>]*>)', re.DOTALL)
+# Magic numbers of documents and media that are mislabelled as text/html surprisingly often
+BINARY_SIGNATURES = (b'%pdf', b'pk\x03\x04', b'gif8', b'\x89png', b'\xff\xd8\xff', b'id3', b'oggs', b'\x1ae\xdf\xa3')
+
+logger = logging.getLogger(__name__)
+
+_session = None
+_session_lock = threading.Lock()
+
+# The shared httpx client and the event loop it runs on, see get_async_client()
+_async_client = None
+_async_loop = None
+_async_lock = threading.Lock()
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def build_session() -> requests.Session:
+    """
+    Create a session with keep-alive connection pools per host and retries
+    with exponential backoff on 5xx responses and connection errors.
+    """
+    retries = _setting('NEWS_HTTP_RETRIES', 3)
+    retry = Retry(
+        total=retries,
+        connect=retries,
+        read=retries,
+        status=retries,
+        backoff_factor=_setting('NEWS_HTTP_BACKOFF_FACTOR', 0.5),
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(['GET', 'HEAD']),
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(
+        pool_connections=_setting('NEWS_HTTP_POOL_CONNECTIONS', 100),
+        pool_maxsize=_setting('NEWS_HTTP_POOL_MAXSIZE', 10),
+        max_retries=retry
+    )
+
+    session = requests.Session()
+    session.headers.update(DEFAULT_HEADERS)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def get_session() -> requests.Session:
+    """Return the process-wide session shared by every fetch thread."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = build_session()
+    return _session
+
+
+def get_timeout():
+    """Separate (connect, read) timeouts in seconds."""
+    return (
+        _setting('NEWS_HTTP_CONNECT_TIMEOUT', 5),
+        _setting('NEWS_HTTP_READ_TIMEOUT', 15)
+    )
+
+
+def get(url: str, headers=None, **kwargs) -> requests.Response:
+    """GET a URL through the shared session with the configured timeouts."""
+    kwargs.setdefault('timeout', get_timeout())
+    return get_session().get(url, headers=headers, **kwargs)
+
+
+class ContentRejected(requests.RequestException):
+    """The response body was abandoned before it was fully read."""
+
+
+class ContentTooLarge(ContentRejected):
+    """The body is larger than the byte budget."""
+
+
+class UnsupportedContent(ContentRejected):
+    """The body is neither an HTML page nor a feed, e.g. a PDF or a video."""
+
+
+def sniff_content(first_chunk: bytes, content_type: str = '', url: str = '') -> Optional[str]:
+    """
+    Classify a body as 'html' or 'feed' from the root element its first bytes
+    start with, then its headers.
+
+    Only the start of the document counts, so markup quoted further in, like
+    HTML inside a feed item's CDATA, cannot change the kind. An XML document
+    whose root is not recognised is taken to be a feed.
+    """
+    head = first_chunk[:1024].lower()
+    if head.startswith(b'\xef\xbb\xbf'):
+        head = head[3:]
+
+    is_xml = head.lstrip().startswith(b'<?xml')
+    doctype = b''
+    position = 0
+    match = PROLOG_RE.match(head)
+    while match:
+        if match.group().lstrip().startswith(b'<!doctype'):
+            doctype = match.group()
+        position = match.end()
+        match = PROLOG_RE.match(head, position)
+    root = head[position:].lstrip()
+
+    if root.startswith(FEED_SIGNATURES):
+        return 'feed'
+    if root.startswith(HTML_SIGNATURES) or b'html' in doctype:
+        return 'html'
+    if is_xml:
+        return 'feed'
+    if head.startswith(BINARY_SIGNATURES) or head[4:8] == b'ftyp' or b'\x00' in head:
+        return None
+
+    content_type = content_type.lower()
+    if 'html' in content_type:
+        return 'html'
+    if 'xml' in content_type or url.endswith('.rss'):
+        return 'feed'
+    return None
+
+
+class Download:
+    """
+    A streamed response whose body is read lazily within a byte budget.
+
+    kind sniffs the first chunk only; content and iter_content raise
+    ContentTooLarge as soon as the budget is exceeded, so an oversized body is
+    never read in full. Use it as a context manager to release the connection
+    and record the bytes read and download time under stage.
+    """
+
+    def __init__(self, response: requests.Response, max_bytes: int, stage: str = 'article_fetch',
+                 started_at: Optional[float] = None):
+        self.response = response
+        self.url = response.url
+        self.status_code = response.status_code
+        self.headers = response.headers
+        self.encoding = response.encoding
+        self.max_bytes = max_bytes
+        self.bytes_read = 0
+        self.stage = stage
+        self.started_at = started_at if started_at is not None else time.perf_counter()
+        # When the last chunk arrived; a feed stays open while its articles are fetched
+        self._last_read_at = time.perf_counter()
+        self._chunks = None
+        self._first = None
+        self._content = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    @property
+    def ok(self) -> bool:
+        return self.response.ok
+
+    def raise_for_status(self) -> None:
+        self.response.raise_for_status()
+
+    def _read_chunk(self) -> bytes:
+        if self._chunks is None:
+            length = self.headers.get('Content-Length', '')
+            if length.isdigit() and int(length) > self.max_bytes:
+                raise ContentTooLarge(f"{self.url} is {length} bytes, over the {self.max_bytes} byte budget")
+            self._chunks = self.response.iter_content(CHUNK_SIZE)
+
+        chunk = next(self._chunks, b'')
+        self._last_read_at = time.perf_counter()
+        self.bytes_read += len(chunk)
+        if self.bytes_read > self.max_bytes:
+            raise ContentTooLarge(f"{self.url} exceeded the {self.max_bytes} byte budget")
+        return chunk
+
+    @property
+    def kind(self) -> Optional[str]:
+        """'html', 'feed' or None, from the first chunk of the body."""
+        if self._first is None:
+            self._first = self._read_chunk()
+        return sniff_content(self._first, self.headers.get('Content-Type', ''), self.url)
+
+    def require(self, *kinds: str) -> str:
+        """Return the body's kind, abandoning the download if it is not one of kinds."""
+        kind = self.kind
+        if kind not in kinds:
+            raise UnsupportedContent(
+                f"{self.url} is not {' or '.join(kinds)} ({self.headers.get('Content-Type', 'unknown type')})"
+            )
+        return kind
+
+    def iter_content(self) -> Iterator[bytes]:
+        """Yield the body chunk by chunk within the byte budget."""
+        if self._first is None:
+            self._first = self._read_chunk()
+        if self._first:
+            yield self._first
+        while True:
+            chunk = self._read_chunk()
+            if not chunk:
+                return
+            yield chunk
+
+    @property
+    def content(self) -> bytes:
+        if self._content is None:
+            self._content = b''.join(self.iter_content())
+        return self._content
+
+    def close(self) -> None:
+        self.response.close()
+        metrics.DOWNLOAD_BYTES.inc(self.bytes_read, stage=self.stage)
+        metrics.HOST_DURATION.observe(self._last_read_at - self.started_at, stage=self.stage,
+                                      host=metrics.host_label(self.url))
+        logger.debug(f"Read {self.bytes_read} bytes from {self.url}")
+
+
+def open_download(url: str, headers=None, max_bytes: Optional[int] = None, stage: str = 'article_fetch') -> Download:
+    """Start a streamed GET whose body may be read up to max_bytes (NEWS_MAX_ARTICLE_BYTES by default)."""
+    if max_bytes is None:
+        max_bytes = _setting('NEWS_MAX_ARTICLE_BYTES', 2 * 1024 * 1024)
+    started_at = time.perf_counter()
+    return Download(get(url, headers=headers, stream=True), max_bytes, stage, started_at)
+
+
+def build_async_client():
+    """
+    An httpx client for fetches made from async views, configured like the
+    shared session. Only connection failures are retried, since httpx has no
+    status retries.
+    """
+    connect_timeout, read_timeout = get_timeout()
+    transport = httpx.AsyncHTTPTransport(
+        retries=_setting('NEWS_HTTP_RETRIES', 3),
+        limits=httpx.Limits(max_keepalive_connections=_setting('NEWS_HTTP_POOL_MAXSIZE', 10))
+    )
+    return httpx.AsyncClient(
+        headers=DEFAULT_HEADERS,
+        timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+        follow_redirects=True,
+        transport=transport
+    )
+
+
+def get_async_client() -> Tuple['httpx.AsyncClient', asyncio.AbstractEventLoop]:
+    """
+    Return the process-wide httpx client and the event loop it runs on,
+    starting both on first use. Raises RuntimeError when httpx is not
+    installed; check httpx first.
+
+    A client's pooled connections belong to the loop they were opened on, and
+    async views may each run on a loop of their own (under WSGI every request
+    gets one), so the client lives on a dedicated loop thread and requests are
+    handed to it, see afetch(). It is closed when the process exits.
+    """
+    global _async_client, _async_loop
+    if httpx is None:
+        raise RuntimeError('httpx is not installed')
+    if _async_client is None:
+        with _async_lock:
+            if _async_client is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name='httpx', daemon=True).start()
+                _async_client = build_async_client()
+                _async_loop = loop
+                atexit.register(close_async_client)
+    return _async_client, _async_loop
+
+
+def close_async_client() -> None:
+    """Close the shared httpx client's connections and stop its loop."""
+    global _async_client, _async_loop
+    with _async_lock:
+        if _async_client is None:
+            return
+        client, loop = _async_client, _async_loop
+        _async_client = _async_loop = None
+    try:
+        asyncio.run_coroutine_threadsafe(client.aclose(), loop).result(timeout=5)
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+
+
+async def afetch(url: str, kinds=('html',), max_bytes: Optional[int] = None,
+                 stage: str = 'article_fetch') -> Tuple[bytes, Optional[str]]:
+    """
+    GET a URL through the shared httpx client and read the body with
+    read_async(), returning the body and its declared encoding. Raises
+    httpx.HTTPStatusError on an error status.
+    """
+    client, loop = get_async_client()
+    return await asyncio.wrap_future(
+        asyncio.run_coroutine_threadsafe(_fetch(client, url, kinds, max_bytes, stage), loop)
+    )
+
+
+async def _fetch(client, url, kinds, max_bytes, stage) -> Tuple[bytes, Optional[str]]:
+    started_at = time.perf_counter()
+    async with client.stream('GET', url) as response:
+        with metrics.errors(stage):
+            response.raise_for_status()
+            content = await read_async(response, kinds, max_bytes, stage, started_at)
+        return content, response.charset_encoding
+
+
+async def read_async(response, kinds=('html',), max_bytes: Optional[int] = None, stage: str = 'article_fetch',
+                     started_at: Optional[float] = None) -> bytes:
+    """
+    Read a streamed httpx response with the same checks as Download: the first
+    chunk must sniff as one of kinds and the body must fit in max_bytes
+    (NEWS_MAX_ARTICLE_BYTES by default), or ContentRejected is raised early.
+    """
+    if max_bytes is None:
+        max_bytes = _setting('NEWS_MAX_ARTICLE_BYTES', 2 * 1024 * 1024)
+    if started_at is None:
+        started_at = time.perf_counter()
+    url = str(response.url)
+    content_type = response.headers.get('Content-Type', '')
+    chunks = []
+    bytes_read = 0
+    last_read_at = time.perf_counter()
+    try:
+        length = response.headers.get('Content-Length', '')
+        if length.isdigit() and int(length) > max_bytes:
+            raise ContentTooLarge(f"{url} is {length} bytes, over the {max_bytes} byte budget")
+        async for chunk in response.aiter_bytes(CHUNK_SIZE):
+            last_read_at = time.perf_counter()
+            bytes_read += len(chunk)
+            if bytes_read > max_bytes:
+                raise ContentTooLarge(f"{url} exceeded the {max_bytes} byte budget")
+            if not chunks and sniff_content(chunk, content_type, url) not in kinds:
+                raise UnsupportedContent(f"{url} is not {' or '.join(kinds)} ({content_type or 'unknown type'})")
+            chunks.append(chunk)
+        return b''.join(chunks)
+    finally:
+        metrics.DOWNLOAD_BYTES.inc(bytes_read, stage=stage)
+        metrics.HOST_DURATION.observe(last_read_at - started_at, stage=stage, host=metrics.host_label(url))
+        logger.debug(f"Read {bytes_read} bytes from {url}")
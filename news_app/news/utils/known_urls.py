@@ -0,0 +1,81 @@
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+from ..models import NewsArticle, URLAlias
+from .urls import url_key
+
+
+class KnownURLs:
+    """
+    In-memory set of article URLs that are already stored, loaded with a single
+    query at the start of a run and shared by all fetch threads.
+
+    URLs claimed for download during a run are tracked separately from stored
+    ones, and each stored URL remembers the feed it was stored from: a feed may
+    only stop early at an item it stored itself, since a link another feed
+    stored or claimed says nothing about the older items below it.
+
+    URLs are compared by url_key(), so tracking parameters, http/https and www.
+    variants of a stored URL, and its recorded aliases, all count as stored.
+    """
+
+    def __init__(self, urls: Iterable[Tuple[str, Optional[str]]] = ()):
+        # url_key -> URL of the feed the article was stored from, or None
+        self._stored: Dict[str, Optional[str]] = {}
+        for url, feed_url in urls:
+            self._stored[url_key(url)] = feed_url
+        self._urls = set(self._stored)
+        self._lock = threading.Lock()
+        self.skipped = 0
+
+    @classmethod
+    def from_database(cls) -> 'KnownURLs':
+        feed_urls = {}
+        known = cls(
+            # One string per feed rather than one per article
+            (url, feed_urls.setdefault(feed_url, feed_url))
+            for url, feed_url in NewsArticle.objects.values_list('url', 'rss_link__url').iterator()
+        )
+        # An alias counts as stored from the feed its article was stored from
+        for alias, canonical_url in URLAlias.objects.values_list('alias', 'canonical_url').iterator():
+            key = url_key(alias)
+            known._stored[key] = known._stored.get(url_key(canonical_url))
+            known._urls.add(key)
+        return known
+
+    def __contains__(self, url: str) -> bool:
+        return url_key(url) in self._urls
+
+    def __len__(self) -> int:
+        return len(self._urls)
+
+    def is_stored(self, *urls: Optional[str], feed_url: str) -> bool:
+        """Whether any of the given URLs (e.g. an item's link and GUID) was stored from the feed."""
+        keys = [url_key(url) for url in urls if url]
+        return any(key in self._stored and self._stored[key] == feed_url for key in keys)
+
+    def mark_stored(self, urls: Iterable[str], feed_url: Optional[str] = None) -> None:
+        """Record URLs that were written to the database from the given feed."""
+        keys = [url_key(url) for url in urls]
+        with self._lock:
+            self._stored.update(dict.fromkeys(keys, feed_url))
+            self._urls.update(keys)
+
+    def claim(self, url: str) -> bool:
+        """Mark a URL as known, returning False if it already was."""
+        key = url_key(url)
+        with self._lock:
+            if key in self._urls:
+                self.skipped += 1
+                return False
+            self._urls.add(key)
+            return True
+
+    def release(self, url: str) -> None:
+        """Forget a claimed URL whose download failed so a later run retries it."""
+        key = url_key(url)
+        with self._lock:
+            self._urls.discard(key)
+
+    def claim_new(self, urls: List[str]) -> List[str]:
+        """Return the URLs that were not known yet, marking them as known."""
+        return [url for url in urls if self.claim(url)]
@@ -0,0 +1,174 @@
+import logging
+import random
+import threading
+import time
+import uuid
+from datetime import timedelta
+from django.conf import settings
+from django.db.models import F, Q
+from django.utils import timezone
+from .feed_parser import FeedParser
+from .known_urls import KnownURLs
+from .. import leases
+from .. import metrics
+from ..models import RSSLink
+
+logger = logging.getLogger(__name__)
+
+LOCK_NAME = 'ingest_scheduler'
+
+
+class SchedulerLocked(Exception):
+    """Another scheduler process already holds the run lock."""
+
+
+class FeedScheduler:
+    """
+    Long-running loop that refreshes each RSSLink when its next_fetch_at is due,
+    learning a per-feed polling interval from how often it publishes.
+
+    Only one scheduler runs at a time: the run lock is a lease row in the
+    database, shared by every process, and is renewed while feeds are
+    fetched. Call stop() (e.g. from a signal handler) to finish the current
+    batch and exit.
+    """
+
+    SCHEDULE_FIELDS = ['next_fetch_at', 'poll_interval', 'arrival_rate', 'hit_ratio', 'consecutive_failures']
+
+    def __init__(self, parser=None, interval=None, jitter=None, batch_size=None, idle_sleep=None):
+        self.parser = parser or FeedParser()
+        # Starting interval for feeds without statistics yet
+        self.interval = interval or getattr(settings, 'NEWS_SCHEDULER_INTERVAL', 1800)
+        self.min_interval = getattr(settings, 'NEWS_SCHEDULER_MIN_INTERVAL', 300)
+        self.max_interval = getattr(settings, 'NEWS_SCHEDULER_MAX_INTERVAL', 86400)
+        self.target_items = getattr(settings, 'NEWS_SCHEDULER_TARGET_ITEMS', 1)
+        self.smoothing = getattr(settings, 'NEWS_SCHEDULER_SMOOTHING', 0.3)
+        self.jitter = jitter if jitter is not None else getattr(settings, 'NEWS_SCHEDULER_JITTER', 0.1)
+        self.batch_size = batch_size or getattr(settings, 'NEWS_SCHEDULER_BATCH_SIZE', 100)
+        self.idle_sleep = idle_sleep or getattr(settings, 'NEWS_SCHEDULER_IDLE_SLEEP', 30)
+        self.lock_timeout = getattr(settings, 'NEWS_SCHEDULER_LOCK_TIMEOUT', 600)
+        self._stop = threading.Event()
+        self._token = uuid.uuid4().hex
+        self._renewed_at = 0.0
+        self._known_urls = None
+        self._extractor = None
+
+    def stop(self):
+        self._stop.set()
+
+    @property
+    def stopping(self):
+        return self._stop.is_set()
+
+    def run(self, once=False):
+        """Poll due feeds until stopped, or for a single pass when once is set."""
+        if not leases.acquire(LOCK_NAME, self._token, self.lock_timeout):
+            raise SchedulerLocked('Another ingestion scheduler is already running')
+        self._renewed_at = time.monotonic()
+
+        logger.info('Ingestion scheduler started')
+        # Extraction workers live as long as the scheduler instead of one batch
+        self._extractor = self.parser.build_extractor()
+        try:
+            while not self.stopping:
+                self._renew_lock()
+                fetched = self.run_due()
+                metrics.publish('scheduler')
+                if once:
+                    break
+                if not fetched:
+                    self._stop.wait(self._seconds_until_next_due())
+        finally:
+            self._extractor.close()
+            self._extractor = None
+            leases.release(LOCK_NAME, self._token)
+            logger.info('Ingestion scheduler stopped')
+
+    def run_due(self):
+        """Fetch one batch of due feeds, returning how many were fetched."""
+        now = timezone.now()
+        due = list(
+            RSSLink.objects.filter(Q(next_fetch_at__isnull=True) | Q(next_fetch_at__lte=now))
+            .order_by(F('next_fetch_at').asc(nulls_first=True), 'id')[:self.batch_size]
+        )
+        if not due:
+            return 0
+
+        if self._known_urls is None and not self.parser.force:
+            self._known_urls = KnownURLs.from_database()
+
+        outcomes = {}
+
+        def feed_done(link, result):
+            outcomes[link.pk] = result
+            # Long batches keep the lock alive
+            self._renew_lock(lazily=True)
+
+        stats = self.parser.fetch_feeds(due, known_urls=self._known_urls, on_feed_done=feed_done,
+                                        extractor=self._extractor)
+        self._schedule(due, outcomes)
+        logger.info(f"Scheduled refresh of {len(due)} feeds: {stats.summary()}")
+        return len(due)
+
+    def next_fetch_at(self, link, result, now):
+        """
+        Update the link's polling statistics with this poll's outcome and return
+        when it should be polled again.
+
+        Healthy feeds are polled about once per expected new item (from the
+        smoothed arrival rate), sooner when most polls find something new and
+        later when most come back empty. Failing feeds back off exponentially.
+        Intervals stay within the configured bounds and are spread by jitter.
+        """
+        alpha = self.smoothing
+        previous_fetch = link.last_fetched
+        interval = link.poll_interval or self.interval
+
+        if result is None or (result.articles is None and not result.not_modified):
+            link.consecutive_failures += 1
+            # The stored interval already carries earlier doublings
+            interval = interval * 2
+        else:
+            link.consecutive_failures = 0
+            new_items = len(result.articles) if result.articles else 0
+            link.hit_ratio = alpha * (1.0 if new_items else 0.0) + (1 - alpha) * link.hit_ratio
+
+            # The first poll returns the feed's whole backlog, so it says nothing about the rate
+            if previous_fetch is not None:
+                hours = max((now - previous_fetch).total_seconds() / 3600, 1 / 60)
+                link.arrival_rate = alpha * (new_items / hours) + (1 - alpha) * link.arrival_rate
+
+            if link.arrival_rate > 0:
+                interval = 3600 * self.target_items / link.arrival_rate
+            elif previous_fetch is not None:
+                interval = interval * 2
+            interval *= 1.5 - link.hit_ratio
+
+        interval = min(max(interval, self.min_interval), self.max_interval)
+        link.poll_interval = int(interval)
+        spread = interval * self.jitter
+        return now + timedelta(seconds=interval + random.uniform(-spread, spread))
+
+    def _schedule(self, links, outcomes):
+        now = timezone.now()
+        for link in links:
+            link.next_fetch_at = self.next_fetch_at(link, outcomes.get(link.pk), now)
+        RSSLink.objects.bulk_update(links, self.SCHEDULE_FIELDS)
+
+    def _seconds_until_next_due(self):
+        next_due = RSSLink.objects.filter(next_fetch_at__isnull=False)\
+                                  .order_by('next_fetch_at')\
+                                  .values_list('next_fetch_at', flat=True)\
+                                  .first()
+        if next_due is None:
+            return self.idle_sleep
+        wait = (next_due - timezone.now()).total_seconds()
+        return min(max(wait, 1), self.idle_sleep)
+
+    def _renew_lock(self, lazily=False):
+        """Extend the lease; lazily only once a tenth of its timeout has passed, to spare the database."""
+        if lazily and time.monotonic() - self._renewed_at < self.lock_timeout / 10:
+            return
+        if not leases.renew(LOCK_NAME, self._token, self.lock_timeout):
+            raise SchedulerLocked('Lost the ingestion scheduler lock')
+        self._renewed_at = time.monotonic()
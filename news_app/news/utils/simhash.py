@@ -0,0 +1,100 @@
+import hashlib
+import re
+from collections import Counter
+from typing import Callable, Dict, Generic, List, Optional, Tuple, TypeVar
+
+BITS = 64
+# Fingerprints are split into this many bands; two fingerprints that differ in
+# fewer bits than there are bands share at least one band exactly
+BANDS = 4
+BAND_BITS = BITS // BANDS
+BAND_MASK = (1 << BAND_BITS) - 1
+
+# Words per shingle; longer shingles make reordered boilerplate matter less
+SHINGLE_SIZE = 3
+# Texts shorter than this give fingerprints too unstable to compare
+MIN_WORDS = 20
+
+# Per-bit counts are summed in 24-bit lanes of one big integer, one lane per
+# fingerprint bit, which is far cheaper in Python than a loop over 64 bits per
+# shingle. SPREAD[i][b] holds byte value b of the hash's i-th byte spread into
+# its eight lanes. A lane holds up to 2**24 shingles, well above the byte budget.
+LANE_BITS = 24
+LANE_MASK = (1 << LANE_BITS) - 1
+SPREAD = [
+    [sum(1 << ((position * 8 + bit) * LANE_BITS) for bit in range(8) if byte >> bit & 1) for byte in range(256)]
+    for position in range(BITS // 8)
+]
+
+TAG_RE = re.compile(r'<[^>]+>')
+WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+T = TypeVar('T')
+
+
+def fingerprint(text: str) -> Optional[int]:
+    """64-bit SimHash of the word shingles of an HTML or plain text, or None if it is too short."""
+    words = WORD_RE.findall(TAG_RE.sub(' ', text or '').lower())
+    if len(words) < MIN_WORDS:
+        return None
+
+    shingles = Counter(' '.join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1))
+    lanes = 0
+    for shingle, count in shingles.items():
+        # The digest read little-endian is the shingle's hash
+        digest = hashlib.blake2b(shingle.encode('utf-8'), digest_size=BITS // 8).digest()
+        lanes += count * sum(map(list.__getitem__, SPREAD, digest))
+
+    # A bit is set when most shingles, by weight, have it set
+    total = sum(shingles.values())
+    return sum(1 << bit for bit in range(BITS) if 2 * (lanes >> (bit * LANE_BITS) & LANE_MASK) > total)
+
+
+def bands(value: int) -> Tuple[int, ...]:
+    """The fingerprint's bands, lowest bits first."""
+    return tuple(value >> (band * BAND_BITS) & BAND_MASK for band in range(BANDS))
+
+
+def distance(a: int, b: int) -> int:
+    """Number of differing bits."""
+    return bin(a ^ b).count('1')
+
+
+def to_signed(value: Optional[int]) -> Optional[int]:
+    """Store an unsigned fingerprint in a signed 64-bit column."""
+    if value is None:
+        return None
+    return value - (1 << BITS) if value >= 1 << (BITS - 1) else value
+
+
+def to_unsigned(value: Optional[int]) -> Optional[int]:
+    if value is None:
+        return None
+    return value + (1 << BITS) if value < 0 else value
+
+
+class BandIndex(Generic[T]):
+    """
+    In-memory lookup of fingerprints by band, so the nearest one is found among
+    the few that share a band instead of by comparing every pair.
+    """
+
+    def __init__(self):
+        self._buckets: List[Dict[int, List[Tuple[int, T]]]] = [{} for _ in range(BANDS)]
+
+    def add(self, value: int, item: T) -> None:
+        for band, key in enumerate(bands(value)):
+            self._buckets[band].setdefault(key, []).append((value, item))
+
+    def nearest(self, value: int, max_distance: int, accept: Optional[Callable[[T], bool]] = None) -> Optional[T]:
+        """
+        The item whose fingerprint is closest to value, if it is within
+        max_distance bits, among the items accept() returns True for.
+        """
+        best, best_distance = None, max_distance + 1
+        for band, key in enumerate(bands(value)):
+            for candidate, item in self._buckets[band].get(key, ()):
+                candidate_distance = distance(value, candidate)
+                if candidate_distance < best_distance and (accept is None or accept(item)):
+                    best, best_distance = item, candidate_distance
+        return best
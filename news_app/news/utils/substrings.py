@@ -0,0 +1,40 @@
+from typing import Dict, List, Set
+
+
+class SubstringIndex:
+    """
+    Answers whether a string of at least `min_length` characters occurs inside
+    any of the texts added so far, without scanning every text.
+
+    Added texts are indexed by the hashes of their windows of `window`
+    characters starting at every `window`-th position. A string occurring in a
+    text at any offset covers one of those windows within its first `window`
+    characters, so a lookup hashes just the `window` windows starting there
+    and searches only the texts that share one of them. Adding a text costs
+    time linear in its length and a lookup no longer grows with the number of
+    texts added, only with the few that share a window with it.
+    """
+
+    def __init__(self, min_length: int):
+        # The windows checked must fit inside the shortest string looked up
+        self.min_length = min_length
+        self.window = (min_length + 1) // 2
+        self._texts: List[str] = []
+        self._windows: Dict[int, List[int]] = {}
+
+    def add(self, text: str) -> None:
+        index = len(self._texts)
+        self._texts.append(text)
+        size = self.window
+        for key in {hash(text[i:i + size]) for i in range(0, len(text) - size + 1, size)}:
+            self._windows.setdefault(key, []).append(index)
+
+    def __contains__(self, text: str) -> bool:
+        if len(text) < self.min_length:
+            raise ValueError(f"Only strings of at least {self.min_length} characters can be looked up")
+
+        size = self.window
+        candidates: Set[int] = set()
+        for i in range(size):
+            candidates.update(self._windows.get(hash(text[i:i + size]), ()))
+        return any(text in self._texts[index] for index in candidates)
@@ -0,0 +1,92 @@
+from typing import List, Optional, Tuple
+from urllib.parse import parse_qsl, unquote_plus, urlencode, urljoin, urlsplit, urlunsplit
+
+# Query parameters that only track where a click came from
+TRACKING_PARAMS = frozenset([
+    'fbclid', 'gclid', 'dclid', 'gbraid', 'wbraid', 'msclkid', 'yclid', 'igshid',
+    'mc_cid', 'mc_eid', '_ga', '_gl', 'cmpid', 'ncid', 'ocid', 'at_medium', 'at_campaign',
+])
+TRACKING_PREFIXES = ('utm_',)
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def _is_tracking(param: str) -> bool:
+    param = unquote_plus(param).lower()
+    return param in TRACKING_PARAMS or param.startswith(TRACKING_PREFIXES)
+
+
+def canonicalize_url(url: Optional[str]) -> Optional[str]:
+    """
+    The form of an article URL that is fetched and stored: lowercase scheme and
+    host, no default port, no fragment, and the query without tracking
+    parameters. Anything that is not an http(s) URL is returned as is.
+
+    The result is still fetchable, so the remaining query is kept byte for byte
+    in its original order, as are http and https and a leading www.; url_key()
+    is what treats those variants as the same story.
+    """
+    if not url:
+        return url
+    url = url.strip()
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return url
+    scheme = parts.scheme.lower()
+    if scheme not in DEFAULT_PORTS or not parts.hostname:
+        return url
+
+    host = parts.hostname
+    if ':' in host:  # IPv6
+        host = f'[{host}]'
+    if port is not None and port != DEFAULT_PORTS[scheme]:
+        host = f'{host}:{port}'
+    # Split by hand rather than parsed, since re-encoding could change what the server sees
+    query = '&'.join(
+        pair for pair in parts.query.split('&')
+        if pair and not _is_tracking(pair.partition('=')[0])
+    )
+    return urlunsplit((scheme, host, parts.path or '/', query, ''))
+
+
+def url_key(url: Optional[str]) -> Optional[str]:
+    """
+    Identity of the story behind a URL, ignoring http/https, a leading www.,
+    and the order and encoding of the query parameters.
+    """
+    url = canonicalize_url(url)
+    scheme, _, rest = (url or '').partition('://')
+    if scheme not in DEFAULT_PORTS:
+        return url
+    rest, _, query = rest.partition('?')
+    if query:
+        rest = f"{rest}?{urlencode(sorted(parse_qsl(query, keep_blank_values=True)))}"
+    return '//' + (rest[4:] if rest.startswith('www.') else rest)
+
+
+def resolve_canonical(requested: str, final: Optional[str], declared: Optional[str]) -> Tuple[str, List[str]]:
+    """
+    Pick the URL an article is stored under once it was fetched, and the other
+    URLs it is known by.
+
+    final is where the request ended up after redirects and declared the page's
+    <link rel=canonical>, which wins when it names an actual page. Site roots are
+    ignored since misconfigured sites declare them for every article. Only this
+    one hop is followed; the declared URL is never fetched.
+    """
+    canonical = canonicalize_url(final or requested)
+    if declared:
+        candidate = canonicalize_url(urljoin(canonical, declared.strip()))
+        parts = urlsplit(candidate)
+        if parts.scheme in DEFAULT_PORTS and parts.path not in ('', '/'):
+            canonical = candidate
+
+    aliases = []
+    keys = {url_key(canonical)}
+    for url in (canonicalize_url(requested), canonicalize_url(final)):
+        if url and url_key(url) not in keys:
+            keys.add(url_key(url))
+            aliases.append(url)
+    return canonical, aliases
@@ -2,15 +2,20 @@
 from datetime import datetime
 from django.shortcuts import render, redirect
 from django.utils.dateparse import parse_date
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse
 from urllib.parse import urlparse
+from asgiref.sync import sync_to_async
 from django.views.decorators.http import require_http_methods
-from .models import NewsSource, NewsArticle, CustomFeed
+from .models import ArticleFacet, NewsSource, NewsArticle, CustomFeed
 from .utils.article_fetcher import fetch_article_content
+from .utils.article_cache import aget_article_detail
 import logging
-from .utils.feed_parser import FeedParser
-from django.db.models import Q
-from django.core.paginator import Paginator
+from django.db.models import Q, Case, When
+from .pagination import akeyset_page, aranked_page
+from . import cache as news_cache
+from . import facets
+from . import metrics
+from . import search
 
 
 logger = logging.getLogger(__name__)
@@ -44,17 +49,12 @@ def add_source(request):
             # Instead of RSSLink, you would now directly store the source
             source.links.create(url=link.strip())
 
+    news_cache.invalidate_sources()
     return JsonResponse({'success': True})
 
 @require_http_methods(["GET"])
-def get_sources(request):
-    sources = NewsSource.objects.prefetch_related('links').all()
-    data = [{
-        'id': source.id,
-        'name': source.name,
-        'links': [link.url for link in source.links.all()]
-    } for source in sources]
-    return JsonResponse({'sources': data})
+async def get_sources(request):
+    return JsonResponse({'sources': await news_cache.aget_sources()})
 
 @require_http_methods(["POST"])
 def update_source(request, source_id):
@@ -68,12 +68,16 @@ def update_source(request, source_id):
     source.name = name
     source.save()
 
-    # Update links for the source
-    source.links.all().delete()
-    for link in links:
-        if link.strip():
-            source.links.create(url=link.strip())
+    # Update links in place: an unchanged link keeps its row, so its articles,
+    # conditional GET validators and polling statistics stay attached to it
+    urls = list(dict.fromkeys(link.strip() for link in links if link.strip()))
+    source.links.exclude(url__in=urls).delete()
+    existing = set(source.links.values_list('url', flat=True))
+    for url in urls:
+        if url not in existing:
+            source.links.create(url=url)
 
+    news_cache.invalidate_sources()
     return JsonResponse({'success': True})
 
 @require_http_methods(["DELETE"])
@@ -81,25 +85,60 @@ def delete_source(request, source_id):
     try:
         source = NewsSource.objects.get(id=source_id)
         source.delete()
+        news_cache.invalidate_sources()
         return JsonResponse({'success': True})
     except NewsSource.DoesNotExist:
         return JsonResponse({'error': 'Source not found'}, status=404)
 
-logger = logging.getLogger(__name__)
+# Query parameters that select a cached article list page
+LIST_CACHE_PARAMS = ('from', 'to', 'source', 'category', 'cursor')
+
+PAGE_SIZE = 20
+
+async def _paginate(news_articles, cursor, ranked=False):
+    """Return one page of articles and the cursor of the next one."""
+    if ranked:
+        return await aranked_page(news_articles, cursor, PAGE_SIZE)
+    return await akeyset_page(news_articles, cursor, PAGE_SIZE)
 
-def home(request):
+async def _article_page_response(request, news_articles, ranked=False):
+    """Render one infinite-scroll page of articles as JSON, served from the cache when possible."""
+    cacheable = not request.GET.get('search')
+    if cacheable:
+        key = await news_cache.aarticle_list_key(request.path, {
+            param: request.GET[param] for param in LIST_CACHE_PARAMS if request.GET.get(param)
+        })
+        data = await news_cache.aget_article_list(key)
+        if data is not None:
+            return JsonResponse(data)
+
+    articles, next_cursor = await _paginate(news_articles, request.GET.get('cursor'), ranked)
+
+    articles_html = render(request, 'news/article_list.html', {
+        'news_articles': articles
+    }).content.decode('utf-8')
+
+    data = {
+        'html': articles_html,
+        'has_more': next_cursor is not None,
+        'next_cursor': next_cursor
+    }
+    if cacheable:
+        await news_cache.aset_article_list(key, data)
+    return JsonResponse(data)
+
+@metrics.instrument_view('home')
+async def home(request):
     """
     Main view for the news homepage. Handles article listing, filtering,
     infinite scrolling, and article detail views.
+
+    Async, so a detail page waiting on a slow publisher does not hold a worker
+    under ASGI. Queries go through the async ORM; the full-text search, which
+    uses raw SQL, runs in a thread.
     """
     try:
-        # Initialize feed parser if no articles exist
-        if not NewsArticle.objects.exists():
-            try:
-                parser = FeedParser()
-                parser.fetch_all_feeds()
-            except Exception as e:
-                logger.error(f"Error fetching feeds: {str(e)}")
+        # Feeds are refreshed by the run_scheduler management command, never here
 
         # Get filter parameters
         from_date = request.GET.get('from')
@@ -108,8 +147,8 @@ def home(request):
         category_filter = request.GET.get('category')
         search_query = request.GET.get('search')
 
-        # Base queryset
-        news_articles = NewsArticle.objects.all()
+        # Base queryset: one representative per story
+        news_articles = NewsArticle.objects.filter(duplicate_of__isnull=True)
 
         # Apply filters
         filters = Q()
@@ -132,45 +171,43 @@ def home(request):
                 logger.warning(f"Invalid to_date format: {e}")
 
         # Source and category filters
+        source_id = None
         if source_filter:
-            filters &= Q(source=source_filter)
+            source_id = await NewsSource.objects.filter(name=source_filter).values_list('id', flat=True).afirst()
+            # An unknown source matches nothing rather than the unlinked articles
+            filters &= Q(news_source_id=source_id) if source_id is not None else Q(pk__in=[])
         if category_filter:
             filters &= Q(category=category_filter)
 
-        # Search filter
+        # Search filter, ranked through the full-text index when it exists
+        ranked_ids = None
+        search_count = None
         if search_query:
-            search_filters = Q(title__icontains=search_query) | \
-                           Q(content__icontains=search_query) | \
-                           Q(summary__icontains=search_query)
-            filters &= search_filters
+            if await sync_to_async(search.is_available)():
+                # The other filters go into the search itself, ahead of its result limit
+                within = news_articles.filter(filters)
+                ranked_ids = await sync_to_async(search.search_article_ids)(search_query, within=within)
+                search_count = await sync_to_async(search.count_matches)(search_query, within=within)
+                filters &= Q(id__in=ranked_ids)
+            else:
+                # Content is stored compressed, so only the plain columns can be scanned
+                search_filters = Q(title__icontains=search_query) | \
+                               Q(summary__icontains=search_query)
+                filters &= search_filters
 
         # Apply all filters and order
-        news_articles = news_articles.filter(filters).order_by('-published_at')
-
-        # Get sources and categories for filters
-        sources = NewsSource.objects.all()
-        categories = NewsArticle.objects.values_list('category', flat=True)\
-                                     .exclude(category='')\
-                                     .exclude(category__isnull=True)\
-                                     .distinct()
+        news_articles = news_articles.filter(filters)
+        if ranked_ids:
+            relevance = Case(*[When(id=article_id, then=position)
+                               for position, article_id in enumerate(ranked_ids)])
+            news_articles = news_articles.order_by(relevance, '-published_at')
+        else:
+            news_articles = news_articles.order_by('-published_at')
 
         # Handle AJAX load more requests
         if request.headers.get('HX-Request'):
             try:
-                offset = int(request.GET.get('offset', 0))
-                limit = 20
-                paginator = Paginator(news_articles, limit)
-                page_number = (offset // limit) + 1
-                page = paginator.get_page(page_number)
-
-                articles_html = render(request, 'news/article_list.html', {
-                    'news_articles': page.object_list
-                }).content.decode('utf-8')
-
-                return JsonResponse({
-                    'html': articles_html,
-                    'has_more': page.has_next()
-                })
+                return await _article_page_response(request, news_articles, ranked=bool(ranked_ids))
             except Exception as e:
                 logger.error(f"Error in AJAX request: {str(e)}")
                 return JsonResponse({
@@ -181,7 +218,7 @@ def home(request):
         article_url = request.GET.get('article_url')
         if article_url:
             try:
-                article_content = fetch_article_content(article_url)
+                article_content = await aget_article_detail(article_url)
                 if article_content:
                     article_content['word_count_display'] = (
                         f"{article_content.get('word_count', 0):,} words"
@@ -203,9 +240,23 @@ def home(request):
                     'error': 'Error loading article'
                 })
 
+        # Get sources and categories for filters
+        sources = await news_cache.aget_sources()
+        categories = await news_cache.aget_categories()
+
         # Initial page load
-        initial_articles = news_articles[:20]
-        total_count = news_articles.count()
+        initial_articles, next_cursor = await _paginate(news_articles, None, ranked=bool(ranked_ids))
+        # A lone source or category filter, or none at all, is counted by the facet table
+        if search_count is not None:
+            total_count = search_count
+        elif from_date or to_date or search_query or (source_filter and category_filter):
+            total_count = await news_articles.acount()
+        elif source_filter:
+            total_count = await facets.aget_count(ArticleFacet.SOURCE, str(source_id)) if source_id is not None else 0
+        elif category_filter:
+            total_count = await facets.aget_count(ArticleFacet.CATEGORY, category_filter)
+        else:
+            total_count = await facets.aget_count()
 
         context = {
             'news_articles': initial_articles,
@@ -217,11 +268,12 @@ def home(request):
             'selected_category': category_filter,
             'search_query': search_query,
             'total_count': total_count,
+            'next_cursor': next_cursor or '',
             'filter_applied': bool(from_date or to_date or source_filter or 
                                  category_filter or search_query)
         }
 
-        context['custom_feeds'] = CustomFeed.objects.all()
+        context['custom_feeds'] = await news_cache.aget_custom_feeds()
 
         return render(request, 'news/home.html', context)
 
@@ -232,14 +284,8 @@ def home(request):
         })
 
 @require_http_methods(["GET"])
-def get_custom_feeds(request):
-    feeds = CustomFeed.objects.all()
-    data = [{
-        'id': feed.id,
-        'name': feed.name,
-        'sources': list(feed.sources.values('id', 'name'))
-    } for feed in feeds]
-    return JsonResponse({'feeds': data})
+async def get_custom_feeds(request):
+    return JsonResponse({'feeds': await news_cache.aget_custom_feeds()})
 
 @require_http_methods(["POST"])
 def add_custom_feed(request):
@@ -255,6 +301,7 @@ def add_custom_feed(request):
     try:
         custom_feed = CustomFeed.objects.create(name=name)
         custom_feed.sources.set(source_ids)
+        news_cache.invalidate_custom_feeds()
         return JsonResponse({
             'success': True,
             'feed': {
@@ -267,36 +314,24 @@ def add_custom_feed(request):
         return JsonResponse({'error': str(e)}, status=500)
 
 @require_http_methods(["GET"])
-def view_custom_feed(request, feed_id):
+@metrics.instrument_view('view_custom_feed')
+async def view_custom_feed(request, feed_id):
     try:
-        custom_feed = CustomFeed.objects.get(id=feed_id)
-        source_ids = custom_feed.sources.values_list('id', flat=True)
+        custom_feed = await CustomFeed.objects.aget(id=feed_id)
+        source_ids = [source_id async for source_id in custom_feed.sources.values_list('id', flat=True)]
 
         # Reuse existing article filtering logic but filter by selected sources
-        news_articles = NewsArticle.objects.filter(
-            source__in=custom_feed.sources.values_list('name', flat=True)
-        ).order_by('-published_at')
+        news_articles = NewsArticle.objects.filter(news_source_id__in=source_ids, duplicate_of__isnull=True)
 
         # Reuse the existing pagination logic
         if request.headers.get('HX-Request'):
-            offset = int(request.GET.get('offset', 0))
-            limit = 20
-            paginator = Paginator(news_articles, limit)
-            page_number = (offset // limit) + 1
-            page = paginator.get_page(page_number)
-
-            articles_html = render(request, 'news/article_list.html', {
-                'news_articles': page.object_list
-            }).content.decode('utf-8')
-
-            return JsonResponse({
-                'html': articles_html,
-                'has_more': page.has_next()
-            })
+            return await _article_page_response(request, news_articles)
 
+        initial_articles, next_cursor = await _paginate(news_articles, None)
         context = {
-            'news_articles': news_articles[:20],
-            'total_count': news_articles.count(),
+            'news_articles': initial_articles,
+            'total_count': await news_articles.acount(),
+            'next_cursor': next_cursor or '',
             'custom_feed': custom_feed,
             'is_custom_feed': True
         }
@@ -305,3 +340,8 @@ def view_custom_feed(request, feed_id):
 
     except CustomFeed.DoesNotExist:
         return redirect('home')
+
+@require_http_methods(["GET"])
+def prometheus_metrics(request):
+    """Ingestion and view metrics in the Prometheus text format."""
+    return HttpResponse(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
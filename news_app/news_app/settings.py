@@ -10,7 +10,9 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from pathlib import Path
+from django.core.exceptions import ImproperlyConfigured
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -81,6 +83,9 @@ DATABASES = {
     }
 }
 
+# Runs the tests against a process-local cache
+TEST_RUNNER = 'news_app.test_runner.NewsTestRunner'
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -123,11 +128,106 @@ STATIC_URL = 'static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
-# Disable cache for development
-
-# Disable cache for development
-CACHES = {
-    'default': {
-        'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+# Cache
+# The NEWS_CACHE_BACKEND environment variable picks redis, file or locmem. By
+# default it is Redis (the build shipped in ../Redis) when the client library is
+# installed, otherwise a file-based cache. Ingestion runs in separate processes
+# and reaches the web server through the cache (list invalidation, metrics
+# snapshots), so the backend must be shared between processes; local memory is
+# only fit for a single process. The test runner (news_app/test_runner.py) and
+# the offline benchmark switch to it themselves.
+
+try:
+    import redis  # noqa: F401
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+NEWS_CACHE_BACKEND = os.environ.get('NEWS_CACHE_BACKEND') or ('redis' if REDIS_AVAILABLE else 'file')
+
+if NEWS_CACHE_BACKEND == 'locmem':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
     }
-}
+elif NEWS_CACHE_BACKEND == 'redis':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ.get('REDIS_URL', 'redis://127.0.0.1:6379/1'),
+            'KEY_PREFIX': 'news_app',
+        }
+    }
+elif NEWS_CACHE_BACKEND == 'file':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ.get('NEWS_CACHE_DIR', str(BASE_DIR / '.cache')),
+            'KEY_PREFIX': 'news_app',
+        }
+    }
+else:
+    raise ImproperlyConfigured(f"Unknown NEWS_CACHE_BACKEND {NEWS_CACHE_BACKEND!r}: use redis, file or locmem")
+
+# Seconds the sources, categories, custom feeds and article list pages stay cached
+NEWS_CACHE_TTL = 300
+
+# News ingestion
+# Threads used for feed and article downloads, and the cap on requests per host
+
+NEWS_INGEST_MAX_WORKERS = 16
+NEWS_INGEST_PER_HOST_LIMIT = 4
+
+# Worker processes extracting article HTML; None uses every core, 0 extracts on the fetch threads
+NEWS_EXTRACT_WORKERS = None
+
+# Articles buffered before they are upserted in one transaction
+NEWS_INGEST_BATCH_SIZE = 200
+
+# Background scheduler (manage.py run_scheduler)
+NEWS_SCHEDULER_INTERVAL = 1800  # seconds between refreshes of a new feed
+NEWS_SCHEDULER_MIN_INTERVAL = 300  # bounds of the learned per-feed interval
+NEWS_SCHEDULER_MAX_INTERVAL = 86400
+NEWS_SCHEDULER_TARGET_ITEMS = 1  # new items a poll should find on average
+NEWS_SCHEDULER_SMOOTHING = 0.3  # weight of the latest poll in the feed statistics
+NEWS_SCHEDULER_JITTER = 0.1  # +/- fraction of the interval, spreads load over time
+NEWS_SCHEDULER_BATCH_SIZE = 100  # due feeds fetched per cycle
+NEWS_SCHEDULER_IDLE_SLEEP = 30  # longest sleep while no feed is due
+NEWS_SCHEDULER_LOCK_TIMEOUT = 600
+
+# Shared HTTP client used by ingestion and the article views
+NEWS_HTTP_POOL_CONNECTIONS = 100  # hosts with a cached keep-alive pool
+NEWS_HTTP_POOL_MAXSIZE = 10  # connections kept alive per host
+NEWS_HTTP_RETRIES = 3
+NEWS_HTTP_BACKOFF_FACTOR = 0.5
+NEWS_HTTP_CONNECT_TIMEOUT = 5
+NEWS_HTTP_READ_TIMEOUT = 15
+# Byte budgets for streamed downloads; larger bodies are abandoned mid-stream
+NEWS_MAX_ARTICLE_BYTES = 2 * 1024 * 1024
+NEWS_MAX_FEED_BYTES = 10 * 1024 * 1024
+
+# BeautifulSoup parser for article pages; None uses html.parser. 'lxml' is faster but
+# repairs malformed markup differently, so extracted paragraphs can change
+NEWS_HTML_PARSER = None
+
+# Seconds an article detail page stays in the content cache
+NEWS_ARTICLE_CACHE_TTL = 3600
+
+# Most relevant full-text matches considered for a search
+NEWS_SEARCH_MAX_RESULTS = 500
+
+# Near-duplicate articles: most differing SimHash bits (below 4 so a band always
+# matches), how many days back a story is looked for, and the share of title
+# words two articles must have in common
+NEWS_DUPLICATE_MAX_DISTANCE = 3
+NEWS_DUPLICATE_WINDOW_DAYS = 7
+NEWS_DUPLICATE_MIN_TITLE_SIMILARITY = 0.5
+
+# Seconds a management command's published metrics stay visible at /metrics
+NEWS_METRICS_SNAPSHOT_TTL = 3600
+
+# Codec for new article content: 'zstd', 'zlib' or 'raw'; None picks zstd when
+# the zstandard package is installed. Every host reading the database needs it
+# once zstd rows exist.
+NEWS_CONTENT_CODEC = None
@@ -14,4 +14,5 @@ urlpatterns = [
     path('custom-feeds/', views.get_custom_feeds, name='get_custom_feeds'),
     path('custom-feeds/add/', views.add_custom_feed, name='add_custom_feed'),
     path('custom-feed/<int:feed_id>/', views.view_custom_feed, name='custom_feed'),
+    path('metrics', views.prometheus_metrics, name='metrics'),  # Prometheus scrape endpoint
 ]